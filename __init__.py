@@ -3,12 +3,11 @@
 Pythva - 将Python代码转换为Java风格的语法
 """
 
+import importlib
+
 from .core import convert_python_to_java_style
-from .mapper import convert_with_mapping, SyntaxMapper
 from .config import get_conversion_config, ConfigManager
 from .errors import get_error_reporter, ConversionError
-from .optimizer import convert_with_optimization, get_optimized_converter
-from .plugins import get_plugin_manager, register_plugin
 
 __version__ = "5.0.0"
 __author__ = "Yaku Makki"
@@ -34,4 +33,34 @@ __all__ = [
     # 插件系统
     'get_plugin_manager',
     'register_plugin',
-]
\ No newline at end of file
+
+    # 可选JIT
+    'optional_njit',
+]
+
+# 延迟导入的名称及其所在子模块（首次访问时才加载）
+_LAZY_IMPORTS = {
+    'convert_with_mapping': '.mapper',
+    'SyntaxMapper': '.mapper',
+    'convert_with_optimization': '.optimizer',
+    'get_optimized_converter': '.optimizer',
+    'get_plugin_manager': '.plugins',
+    'register_plugin': '.plugins',
+    'optional_njit': '._jit',
+}
+
+
+def __getattr__(name):
+    """按需导入较重的子模块"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """列出包属性（包含延迟导入的名称）"""
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
\ No newline at end of file
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""
+Pythva可选JIT支持
+安装了Numba时使用njit编译数值扫描循环，否则原样返回函数
+"""
+
+try:
+    from numba import njit as _njit
+    HAVE_NUMBA = True
+except ImportError:
+    _njit = None
+    HAVE_NUMBA = False
+
+
+def optional_njit(*args, **kwargs):
+    """可选的njit装饰器，支持@optional_njit与@optional_njit(...)两种写法"""
+    # 默认cache=True，编译结果可在多次CLI调用间复用
+    if args and callable(args[0]) and len(args) == 1 and not kwargs:
+        func = args[0]
+        if not HAVE_NUMBA:
+            return func
+        return _njit(cache=True)(func)
+
+    def decorator(func):
+        if not HAVE_NUMBA:
+            return func
+        kwargs.setdefault('cache', True)
+        return _njit(*args, **kwargs)(func)
+
+    return decorator
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Pythva语法树缓存
+按源码哈希缓存ast.parse结果，供各转换入口共享
+"""
+
+import ast
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Union
+
+try:
+    from .config import get_conversion_config
+except ImportError:
+    from config import get_conversion_config
+
+
+# 源码摘要到语法树的LRU缓存
+_AST_CACHE: "OrderedDict[bytes, ast.Module]" = OrderedDict()
+_max_size: Optional[int] = None
+# 多线程服务器下并发请求会同时读写缓存，LRU的调整需加锁
+_cache_lock = threading.Lock()
+
+
+def _source_key(src: Union[str, bytes]) -> bytes:
+    """计算源码摘要（str与bytes分开计算，避免编码声明导致的歧义）"""
+    if isinstance(src, str):
+        return hashlib.blake2b(src.encode('utf-8'), digest_size=16, person=b'str').digest()
+    return hashlib.blake2b(src, digest_size=16, person=b'bytes').digest()
+
+
+def parse_cached(src: Union[str, bytes]) -> ast.Module:
+    """解析源码，相同源码复用已解析的语法树（语法树被共享，调用方不得修改）"""
+    global _max_size
+    if _max_size is None:
+        config = get_conversion_config()
+        _max_size = config.max_cache_size if config.cache_enabled else 0
+
+    if _max_size <= 0:
+        return ast.parse(src, type_comments=False)
+
+    key = _source_key(src)
+    with _cache_lock:
+        tree = _AST_CACHE.get(key)
+        if tree is not None:
+            _AST_CACHE.move_to_end(key)
+            return tree
+
+    # 在锁外解析；语法错误直接抛出，不会写入缓存
+    tree = ast.parse(src, type_comments=False)
+    with _cache_lock:
+        _AST_CACHE[key] = tree
+        if len(_AST_CACHE) > _max_size:
+            _AST_CACHE.popitem(last=False)
+    return tree
+
+
+def clear_parse_cache():
+    """清空语法树缓存（配置重新加载后按新配置重建）"""
+    global _max_size
+    with _cache_lock:
+        _AST_CACHE.clear()
+        _max_size = None
@@ -7,8 +7,9 @@ Pythva命令行接口
 import argparse
 import sys
 import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Union, List, Tuple, Dict
 
 try:
     from .core import convert_python_to_java_style
@@ -18,26 +19,39 @@ except ImportError:
     from mapper import convert_with_mapping
 
 
-def read_file(file_path: str) -> str:
-    """读取文件内容"""
+# 写文件时每次系统调用的块大小
+WRITE_CHUNK_SIZE = 64 * 1024
+
+# 批量转换时文件数少于该值则串行处理，避免进程池启动开销
+PARALLEL_THRESHOLD = 4
+
+
+def read_file(file_path: str) -> bytes:
+    """读取文件内容（原始字节，由ast.parse负责解码）"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with open(file_path, 'rb') as f:
             return f.read()
     except FileNotFoundError:
         print(f"错误：文件 '{file_path}' 不存在")
         sys.exit(1)
-    except UnicodeDecodeError:
-        print(f"错误：无法读取文件 '{file_path}'，请检查文件编码")
-        sys.exit(1)
 
 
 def write_file(file_path: str, content: str) -> None:
     """写入文件内容"""
     try:
         # 确保目录存在
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        dir_name = os.path.dirname(file_path)
+        if dir_name:
+            os.makedirs(dir_name, exist_ok=True)
+
+        data = memoryview(content.encode('utf-8'))
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            while data:
+                written = os.write(fd, data[:WRITE_CHUNK_SIZE])
+                data = data[written:]
+        finally:
+            os.close(fd)
         print(f"转换后的代码已保存到: {file_path}")
     except Exception as e:
         print(f"错误：无法写入文件 '{file_path}': {e}")
@@ -45,7 +59,7 @@ def write_file(file_path: str, content: str) -> None:
 
 
 def convert_code(
-    input_code: str,
+    input_code: Union[str, bytes],
     output_file: Optional[str] = None,
     use_enhanced: bool = False,
     show_imports: bool = True
@@ -69,10 +83,98 @@ def convert_code(
         print(error_msg)
         if not output_file:
             print("\n原始代码:")
+            if isinstance(input_code, bytes):
+                input_code = input_code.decode('utf-8', errors='replace')
             print(input_code)
         sys.exit(1)
 
 
+def collect_input_files(inputs: List[str]) -> List[Tuple[str, str]]:
+    """展开输入路径，返回(文件路径, 相对输出路径)列表，目录会递归查找.py文件"""
+    files = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            for py_file in sorted(path.rglob("*.py")):
+                files.append((str(py_file), str(py_file.relative_to(path))))
+        else:
+            files.append((item, path.name))
+    return files
+
+
+def _convert_file_worker(task: Tuple[str, bool]) -> Tuple[str, Optional[str], Optional[str]]:
+    """转换单个文件，返回(文件路径, 转换结果, 错误信息)（供进程池调用）"""
+    file_path, use_enhanced = task
+    try:
+        with open(file_path, 'rb') as f:
+            source = f.read()
+
+        if use_enhanced:
+            converted_code = convert_with_mapping(source)
+        else:
+            converted_code = convert_python_to_java_style(source)
+
+        return file_path, converted_code, None
+    except Exception as e:
+        return file_path, None, str(e)
+
+
+def _find_output_conflicts(input_files: List[Tuple[str, str]]) -> List[str]:
+    """找出会写入同一输出文件的不同输入文件，返回错误信息列表"""
+    sources: Dict[str, str] = {}
+    conflicts = []
+    for file_path, relative_path in input_files:
+        output_path = str(Path(relative_path).with_suffix(".java"))
+        first_path = sources.setdefault(output_path, file_path)
+        if os.path.realpath(first_path) != os.path.realpath(file_path):
+            conflicts.append(
+                f"错误：'{file_path}' 与 '{first_path}' 的输出文件相同 ({output_path})"
+            )
+    return conflicts
+
+
+def convert_files(
+    input_files: List[Tuple[str, str]],
+    output_dir: Optional[str] = None,
+    use_enhanced: bool = False
+) -> int:
+    """批量转换文件，返回失败的文件数"""
+    # 输出文件名冲突时不写入任何文件，避免结果互相覆盖
+    if output_dir:
+        conflicts = _find_output_conflicts(input_files)
+        if conflicts:
+            for message in conflicts:
+                print(message)
+            return len(conflicts)
+
+    tasks = [(file_path, use_enhanced) for file_path, _ in input_files]
+
+    if len(tasks) < PARALLEL_THRESHOLD:
+        return _handle_results(map(_convert_file_worker, tasks), input_files, output_dir)
+
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = executor.map(_convert_file_worker, tasks, chunksize=16)
+        return _handle_results(results, input_files, output_dir)
+
+
+def _handle_results(results, input_files: List[Tuple[str, str]],
+                    output_dir: Optional[str]) -> int:
+    """按输入顺序输出或保存批量转换结果"""
+    failures = 0
+    for (file_path, converted_code, error), (_, relative_path) in zip(results, input_files):
+        if error is not None:
+            print(f"错误：转换文件 '{file_path}' 失败: {error}")
+            failures += 1
+        elif output_dir:
+            output_path = Path(output_dir) / Path(relative_path).with_suffix(".java")
+            write_file(str(output_path), converted_code)
+        else:
+            print(f"// ===== {file_path} =====")
+            print(converted_code)
+
+    return failures
+
+
 def create_example_files():
     """创建示例文件"""
     examples_dir = Path("examples")
@@ -123,6 +225,7 @@ def main():
   python -m pythva.cli convert example.py
   python -m pythva.cli convert example.py -o example.java
   python -m pythva.cli convert example.py --enhanced
+  python -m pythva.cli convert src/ other.py -o build/
   python -m pythva.cli create-examples
         '''
     )
@@ -135,12 +238,13 @@ def main():
         help='转换Python文件为Java风格'
     )
     convert_parser.add_argument(
-        'input_file',
-        help='输入的Python文件路径'
+        'inputs',
+        nargs='+',
+        help='输入的Python文件或目录路径（目录会递归转换其中的.py文件）'
     )
     convert_parser.add_argument(
         '-o', '--output',
-        help='输出文件路径（不指定则输出到控制台）'
+        help='输出文件路径，批量转换时为输出目录（不指定则输出到控制台）'
     )
     convert_parser.add_argument(
         '-e', '--enhanced',
@@ -166,16 +270,21 @@ def main():
         return
 
     if args.command == 'convert':
-        # 读取输入文件
-        input_code = read_file(args.input_file)
-
-        # 转换代码
-        convert_code(
-            input_code=input_code,
-            output_file=args.output,
-            use_enhanced=args.enhanced,
-            show_imports=not args.no_imports
-        )
+        input_files = collect_input_files(args.inputs)
+
+        if len(args.inputs) == 1 and len(input_files) == 1 and not os.path.isdir(args.inputs[0]):
+            # 读取输入文件
+            input_code = read_file(input_files[0][0])
+
+            # 转换代码
+            convert_code(
+                input_code=input_code,
+                output_file=args.output,
+                use_enhanced=args.enhanced,
+                show_imports=not args.no_imports
+            )
+        elif convert_files(input_files, args.output, args.enhanced):
+            sys.exit(1)
 
     elif args.command == 'create-examples':
         create_example_files()
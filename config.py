@@ -5,14 +5,28 @@ Pythva配置文件管理
 """
 
 import json
+import marshal
 import os
+import sys
 import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields, replace
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
 
-@dataclass
+# YAML解析结果的缓存文件后缀（marshal格式，保留键和值的原始类型）
+_YAML_CACHE_SUFFIX = ".ycache"
+
+
+# dataclass的slots参数需要Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class ConversionConfig:
     """转换配置类"""
 
@@ -56,7 +70,7 @@ class ConversionConfig:
     verbose_output: bool = False
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class PluginConfig:
     """插件配置类"""
 
@@ -65,6 +79,44 @@ class PluginConfig:
     plugin_settings: Dict[str, Any] = field(default_factory=dict)
 
 
+# ConversionConfig的字段名
+_CONVERSION_FIELDS = frozenset(f.name for f in fields(ConversionConfig))
+
+# 配置文件名（按优先级排列）
+_CWD_CONFIG_NAMES = (
+    "pythva.yaml",
+    "pythva.yml",
+    "pythva.json",
+    ".pythva.yaml",
+    ".pythva.yml",
+    ".pythva.json",
+)
+_HOME_CONFIG_NAMES = (
+    ".pythva.yaml",
+    ".pythva.yml",
+    ".pythva.json",
+)
+
+# 按工作目录缓存的配置文件查找结果
+_config_file_cache: Dict[str, Optional[str]] = {}
+
+
+def _scan_config_dir(directory: str, names=_CWD_CONFIG_NAMES) -> Optional[str]:
+    """单次扫描目录，按优先级返回找到的配置文件名"""
+    wanted = frozenset(names)
+    try:
+        with os.scandir(directory) as it:
+            found = {entry.name for entry in it
+                     if entry.name in wanted and entry.is_file()}
+    except OSError:
+        return None
+
+    for name in names:
+        if name in found:
+            return name
+    return None
+
+
 class ConfigManager:
     """配置管理器"""
 
@@ -77,23 +129,17 @@ class ConfigManager:
 
     def _find_config_file(self) -> Optional[str]:
         """查找配置文件"""
-        search_paths = [
-            "pythva.yaml",
-            "pythva.yml",
-            "pythva.json",
-            ".pythva.yaml",
-            ".pythva.yml",
-            ".pythva.json",
-            os.path.expanduser("~/.pythva.yaml"),
-            os.path.expanduser("~/.pythva.yml"),
-            os.path.expanduser("~/.pythva.json")
-        ]
-
-        for path in search_paths:
-            if os.path.exists(path):
-                return path
-
-        return None
+        cwd = os.getcwd()
+        if cwd not in _config_file_cache:
+            config_file = _scan_config_dir(".")
+            if config_file is None:
+                home = os.path.expanduser("~")
+                config_file = _scan_config_dir(home, _HOME_CONFIG_NAMES)
+                if config_file is not None:
+                    config_file = os.path.join(home, config_file)
+            _config_file_cache[cwd] = config_file
+
+        return _config_file_cache[cwd]
 
     def _load_config(self):
         """加载配置文件"""
@@ -110,12 +156,40 @@ class ConfigManager:
 
     def _load_yaml_config(self):
         """加载YAML配置文件"""
-        with open(self.config_file, 'r', encoding='utf-8') as f:
-            data = yaml.safe_load(f)
+        data = self._load_yaml_cache()
+        if data is None:
+            with open(self.config_file, 'r', encoding='utf-8') as f:
+                data = yaml.load(f, Loader=_YamlLoader)
+            self._save_yaml_cache(data)
 
         if data:
             self._apply_config_data(data)
 
+    def _load_yaml_cache(self) -> Optional[Any]:
+        """读取YAML配置的解析缓存（仅当与源文件修改时间一致时有效）"""
+        cache_file = self.config_file + _YAML_CACHE_SUFFIX
+        try:
+            if os.stat(cache_file).st_mtime_ns != os.stat(self.config_file).st_mtime_ns:
+                return None
+            with open(cache_file, 'rb') as f:
+                return marshal.load(f)
+        except (OSError, EOFError, TypeError, ValueError):
+            return None
+
+    def _save_yaml_cache(self, data: Any):
+        """将YAML解析结果写入缓存，并同步源文件的修改时间"""
+        cache_file = self.config_file + _YAML_CACHE_SUFFIX
+        try:
+            source_stat = os.stat(self.config_file)
+            # 先序列化再写文件：含日期等marshal不支持的值时直接跳过缓存
+            payload = marshal.dumps(data)
+            with open(cache_file, 'wb') as f:
+                f.write(payload)
+            os.utime(cache_file, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        except (OSError, TypeError, ValueError):
+            # 缓存写入失败不影响配置加载
+            pass
+
     def _load_json_config(self):
         """加载JSON配置文件"""
         with open(self.config_file, 'r', encoding='utf-8') as f:
@@ -129,9 +203,10 @@ class ConfigManager:
         # 转换配置
         if 'conversion' in data:
             conv_data = data['conversion']
-            for key, value in conv_data.items():
-                if hasattr(self.config, key):
-                    setattr(self.config, key, value)
+            changes = {key: value for key, value in conv_data.items()
+                       if key in _CONVERSION_FIELDS}
+            if changes:
+                self.config = replace(self.config, **changes)
 
         # 插件配置
         if 'plugins' in data:
@@ -201,9 +276,12 @@ class ConfigManager:
 
     def update_conversion_config(self, **kwargs):
         """更新转换配置"""
-        for key, value in kwargs.items():
-            if hasattr(self.config, key):
-                setattr(self.config, key, value)
+        changes = {key: value for key, value in kwargs.items()
+                   if key in _CONVERSION_FIELDS}
+        self.config = replace(self.config, **changes)
+
+        # 已缓存的转换结果可能基于旧配置
+        _clear_conversion_caches()
 
     def enable_plugin(self, plugin_name: str):
         """启用插件"""
@@ -236,7 +314,24 @@ def get_conversion_config() -> ConversionConfig:
 def reload_config():
     """重新加载配置"""
     global _config_manager
+    _config_file_cache.clear()
     _config_manager = ConfigManager()
+    _clear_conversion_caches()
+
+
+def _clear_conversion_caches():
+    """配置变化后清空转换相关缓存"""
+    try:
+        from .core import clear_conversion_cache
+        from .mapper import clear_mapping_cache
+        from ._parse import clear_parse_cache
+    except ImportError:
+        from core import clear_conversion_cache
+        from mapper import clear_mapping_cache
+        from _parse import clear_parse_cache
+    clear_conversion_cache()
+    clear_mapping_cache()
+    clear_parse_cache()
 
 
 if __name__ == "__main__":
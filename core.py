@@ -5,42 +5,217 @@ Pythva核心转换器模块
 """
 
 import ast
+import io
 import re
+import sys
+from functools import lru_cache
 from typing import Dict, List, Any, Optional
 
+try:
+    from .config import get_conversion_config
+    from ._parse import parse_cached
+except ImportError:
+    from config import get_conversion_config
+    from _parse import parse_cached
+
+
+# 常用Java类型名（驻留字符串，所有转换共享同一对象）
+_T_OBJECT = sys.intern("Object")
+_T_INT = sys.intern("int")
+_T_STRING = sys.intern("String")
+_T_DOUBLE = sys.intern("double")
+_T_BOOLEAN = sys.intern("boolean")
+_T_LIST = sys.intern("List")
+_T_MAP = sys.intern("Map")
+_T_LIST_OBJECT = sys.intern("List<Object>")
+_T_MAP_OBJECT = sys.intern("Map<Object, Object>")
+
+# 常量值的Python类型到Java类型的映射（按精确类型查找，bool不会被当作int）
+_CONSTANT_TYPES = {
+    int: _T_INT,
+    float: _T_DOUBLE,
+    str: _T_STRING,
+    bool: _T_BOOLEAN,
+}
+
+# 类型注解映射
+_ANNOTATION_TYPES = {
+    'int': _T_INT,
+    'str': _T_STRING,
+    'float': _T_DOUBLE,
+    'bool': _T_BOOLEAN,
+    'list': _T_LIST,
+    'dict': _T_MAP,
+}
+
+# 二元运算符映射
+_BINOPS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.Mod: "%",
+}
+
+# 比较运算符映射
+_CMPOPS = {
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+}
+
+
+def _strip_docstring(body: List[ast.stmt]) -> List[ast.stmt]:
+    """去除语句列表开头的文档字符串"""
+    if body:
+        first = body[0]
+        if (isinstance(first, ast.Expr) and isinstance(first.value, ast.Constant)
+                and isinstance(first.value.value, str)):
+            return body[1:]
+    return body
+
+
+# 没有Java对应形式的运算符，保留Python写法
+_PY_OPERATORS = {
+    ast.Pow: "**",
+    ast.FloorDiv: "//",
+    ast.MatMult: "@",
+    ast.LShift: "<<",
+    ast.RShift: ">>",
+    ast.BitOr: "|",
+    ast.BitXor: "^",
+    ast.BitAnd: "&",
+    ast.Is: "is",
+    ast.IsNot: "is not",
+    ast.In: "in",
+    ast.NotIn: "not in",
+}
+
+# ast.unparse需要Python 3.9+
+_ast_unparse = getattr(ast, "unparse", None)
+
+
+def _unparse(node) -> str:
+    """无法转换的节点按Python源码原样输出"""
+    if isinstance(node, ast.AST) and _ast_unparse is not None:
+        return _ast_unparse(node)
+    return str(node)
+
+
+# 原样输出时自带边界的节点，作为运算数时无需再加括号
+_SELF_DELIMITED_NODES = (
+    ast.Subscript, ast.Tuple, ast.Set,
+    ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp,
+)
+
 
 class JavaStyleConverter(ast.NodeVisitor):
     """Python到Java风格的代码转换器"""
 
+    # 输出相关常量，make_converter会按转换配置生成覆盖这些属性的子类
+    _INDENT_UNIT = "    "
+    _PRINT_FUNCTION = "System.out.println"
+    _PACKAGE_NAME: Optional[str] = "pythva.generated"
+    _DEFAULT_TYPE = _T_OBJECT
+    _INT_TYPE = _T_INT
+    _STRING_TYPE = _T_STRING
+    _LIST_OBJECT_TYPE = _T_LIST_OBJECT
+    _MAP_OBJECT_TYPE = _T_MAP_OBJECT
+    _CONSTANT_TYPES = _CONSTANT_TYPES
+    _ANNOTATION_TYPES = _ANNOTATION_TYPES
+
     def __init__(self):
+        self._indents: List[str] = [""]
         self.indent_level = 0
-        self.lines: List[str] = []
+        # StringIO在末尾顺序写入时内部分块累积，getvalue时一次拼接，无需按源码大小预分配
+        self._buf = io.StringIO()
         self.class_stack: List[str] = []
         self.in_method = False
 
+        # 节点类型到访问方法的分派表，避免NodeVisitor.visit的反射查找
+        self._dispatch = {
+            ast.Module: self._visit_module,
+            ast.ClassDef: self.visit_ClassDef,
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.Assign: self.visit_Assign,
+            ast.Return: self.visit_Return,
+            ast.If: self.visit_If,
+            ast.For: self.visit_For,
+            ast.While: self.visit_While,
+            ast.Expr: self.visit_Expr,
+            ast.JoinedStr: self.visit_JoinedStr,
+            ast.FormattedValue: self.visit_FormattedValue,
+        }
+
     def convert(self, code: str) -> str:
         """转换Python代码为Java风格"""
         try:
             # 解析Python代码
-            tree = ast.parse(code)
-            self.visit(tree)
+            tree = parse_cached(code)
+            self._visit_body(_strip_docstring(tree.body))
+
+            # 去掉最后一行的换行符
+            output = self._buf.getvalue()[:-1]
 
             # 添加包声明（如果需要）
-            if self.class_stack:
-                package_lines = [f"package pythva.generated;"]
-                package_lines.append("")
-                return "\n".join(package_lines + self.lines)
+            if self.class_stack and self._PACKAGE_NAME:
+                return f"package {self._PACKAGE_NAME};\n\n" + output
 
-            return "\n".join(self.lines)
+            return output
         except SyntaxError as e:
+            if isinstance(code, bytes):
+                code = code.decode('utf-8', errors='replace')
             return f"// 语法错误: {e}\n{code}"
 
+    def visit(self, node):
+        """通过分派表访问节点"""
+        handler = self._dispatch.get(type(node))
+        if handler is not None:
+            return handler(node)
+        return self.generic_visit(node)
+
+    def _visit_module(self, node: ast.Module):
+        """访问模块"""
+        self._visit_body(_strip_docstring(node.body))
+
+    def _visit_body(self, body: List[ast.stmt]):
+        """依次访问语句列表"""
+        dispatch = self._dispatch
+        for node in body:
+            handler = dispatch.get(type(node))
+            if handler is not None:
+                handler(node)
+            else:
+                self.generic_visit(node)
+
+    @property
+    def indent_level(self) -> int:
+        """当前缩进层级"""
+        return self._indent_level
+
+    @indent_level.setter
+    def indent_level(self, level: int):
+        # 缩进层级变化时更新当前缩进字符串，add_line无需再查表
+        self._indent_level = level
+        self._indent = self._get_indent(level)
+
     def add_line(self, line: str, indent: bool = True):
         """添加一行代码"""
+        buf = self._buf
         if indent and line.strip():
-            self.lines.append("    " * self.indent_level + line)
-        else:
-            self.lines.append(line)
+            buf.write(self._indent)
+        buf.write(line)
+        buf.write("\n")
+
+    def _get_indent(self, level: int) -> str:
+        """获取缩进字符串（按需扩展缩进表）"""
+        indents = self._indents
+        while len(indents) <= level:
+            indents.append(indents[-1] + self._INDENT_UNIT)
+        return indents[level]
 
     def visit_ClassDef(self, node: ast.ClassDef):
         """访问类定义"""
@@ -62,8 +237,7 @@ class JavaStyleConverter(ast.NodeVisitor):
         self.indent_level += 1
 
         # 访问类体
-        for item in node.body:
-            self.visit(item)
+        self._visit_body(_strip_docstring(node.body))
 
         self.indent_level -= 1
         self.add_line("}")
@@ -77,22 +251,22 @@ class JavaStyleConverter(ast.NodeVisitor):
             method_name = self.class_stack[-1] if self.class_stack else "Constructor"
 
         # 获取返回类型注解
-        returns = "Object"
+        returns = self._DEFAULT_TYPE
         if node.returns:
             returns = self._get_type_annotation(node.returns)
 
         # 获取参数类型注解
         params = []
         for arg in node.args.args:
-            param_type = "Object"  # 默认类型
+            param_type = self._DEFAULT_TYPE  # 默认类型
             if arg.arg in ['self']:  # 跳过self参数
                 continue
 
             # 特殊参数类型处理
             if method_name == "__init__" and arg.arg == 'name':
-                param_type = "String"
+                param_type = self._STRING_TYPE
             elif arg.arg in ['a', 'b', 'x', 'y']:
-                param_type = "int"  # 常见数学参数
+                param_type = self._INT_TYPE  # 常见数学参数
 
             params.append(f"{param_type} {arg.arg}")
 
@@ -102,8 +276,7 @@ class JavaStyleConverter(ast.NodeVisitor):
         self.indent_level += 1
 
         # 访问方法体
-        for item in node.body:
-            self.visit(item)
+        self._visit_body(_strip_docstring(node.body))
 
         self.indent_level = old_indent
         self.add_line("}")
@@ -120,13 +293,14 @@ class JavaStyleConverter(ast.NodeVisitor):
             # 类型推断
             var_type = self._infer_type(node.value)
             var_names = ", ".join(targets)
+            value_code = self._get_value_code(node.value)
 
             if len(targets) == 1:
-                self.add_line(f"{var_type} {var_names} = {self._get_value_code(node.value)};")
+                self.add_line(f"{var_type} {var_names} = {value_code};")
             else:
                 self.add_line(f"{var_type} {var_names};")
                 for target in targets:
-                    self.add_line(f"{target} = {self._get_value_code(node.value)};")
+                    self.add_line(f"{target} = {value_code};")
 
     def visit_Return(self, node: ast.Return):
         """访问返回语句"""
@@ -141,8 +315,7 @@ class JavaStyleConverter(ast.NodeVisitor):
         self.add_line(f"if ({condition}) {{")
         self.indent_level += 1
 
-        for item in node.body:
-            self.visit(item)
+        self._visit_body(node.body)
 
         self.indent_level -= 1
         self.add_line("}")
@@ -152,8 +325,7 @@ class JavaStyleConverter(ast.NodeVisitor):
             self.add_line("else {")
             self.indent_level += 1
 
-            for item in node.orelse:
-                self.visit(item)
+            self._visit_body(node.orelse)
 
             self.indent_level -= 1
             self.add_line("}")
@@ -166,8 +338,7 @@ class JavaStyleConverter(ast.NodeVisitor):
         self.add_line(f"for ({target} : {iter_expr}) {{")
         self.indent_level += 1
 
-        for item in node.body:
-            self.visit(item)
+        self._visit_body(node.body)
 
         self.indent_level -= 1
         self.add_line("}")
@@ -178,33 +349,26 @@ class JavaStyleConverter(ast.NodeVisitor):
         self.add_line(f"while ({condition}) {{")
         self.indent_level += 1
 
-        for item in node.body:
-            self.visit(item)
+        self._visit_body(node.body)
 
         self.indent_level -= 1
         self.add_line("}")
 
     def visit_Expr(self, node: ast.Expr):
         """访问表达式语句"""
-        if isinstance(node.value, ast.Call):
+        value = node.value
+        if isinstance(value, ast.Call):
             # 函数调用
-            call_code = self._get_call_code(node.value)
+            call_code = self._get_call_code(value)
             self.add_line(f"{call_code};")
-        elif isinstance(node.value, ast.Constant):
-            # 常量表达式
-            if isinstance(node.value.value, str):
-                self.add_line(f'System.out.println("{node.value.value}");')
+        elif isinstance(value, ast.Constant) and isinstance(value.value, str):
+            # 字符串常量表达式（文档字符串已在访问语句列表前去除）
+            self.add_line(f'{self._PRINT_FUNCTION}("{value.value}");')
+        # 其他表达式语句没有Java对应输出
 
     def visit_JoinedStr(self, node: ast.JoinedStr):
         """处理f-string"""
-        parts = []
-        for value in node.values:
-            if isinstance(value, ast.Constant):
-                parts.append(f'"{value.value}"')
-            elif isinstance(value, ast.FormattedValue):
-                parts.append(self._get_value_code(value.value))
-
-        return " + ".join(parts)
+        return self._get_value_code(node)
 
     def visit_FormattedValue(self, node: ast.FormattedValue):
         """处理格式化值"""
@@ -212,116 +376,247 @@ class JavaStyleConverter(ast.NodeVisitor):
 
     def _get_value_code(self, node) -> str:
         """获取值的代码表示"""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Constant):
-            if isinstance(node.value, str):
-                return f'"{node.value}"'
-            return str(node.value)
-        elif isinstance(node, ast.List):
-            elements = [self._get_value_code(elt) for elt in node.elts]
-            return f"Arrays.asList({', '.join(elements)})"
-        elif isinstance(node, ast.Dict):
-            keys = [self._get_value_code(k) for k in node.keys]
-            values = [self._get_value_code(v) for v in node.values]
-            items = [f"{k}, {v}" for k, v in zip(keys, values)]
-            return f"Map.of({', '.join(items)})"
-        elif isinstance(node, ast.BinOp):
-            left = self._get_value_code(node.left)
-            right = self._get_value_code(node.right)
-            op = self._get_binop(node.op)
-            return f"({left} {op} {right})"
-        elif isinstance(node, ast.Compare):
-            left = self._get_value_code(node.left)
-            comparators = node.comparators
-            if comparators:
-                ops = [self._get_cmpop(op) for op in [node.ops[0]]]
-                return f"({left} {ops[0]} {self._get_value_code(comparators[0])})"
-            return str(node)
-        elif isinstance(node, ast.Call):
-            return self._get_call_code(node)
-        elif isinstance(node, ast.Attribute):
-            return f"{self._get_value_code(node.value)}.{node.attr}"
-        elif isinstance(node, ast.JoinedStr):
-            return self.visit_JoinedStr(node)
-        return str(node)
+        out: List[str] = []
+        self._emit_value(node, out)
+        return "".join(out)
+
+    def _emit_value(self, node, out: List[str]):
+        """将值的代码片段依次写入out，子表达式不生成中间字符串"""
+        emitter = _VALUE_EMITTERS.get(type(node))
+        if emitter is not None:
+            emitter(self, node, out)
+        else:
+            out.append(_unparse(node))
+
+    def _emit_operand(self, node, out: List[str]):
+        """写入运算数；原样输出的表达式（如条件表达式、lambda）加括号以保持优先级"""
+        emitter = _VALUE_EMITTERS.get(type(node))
+        if emitter is not None:
+            emitter(self, node, out)
+        elif isinstance(node, _SELF_DELIMITED_NODES):
+            out.append(_unparse(node))
+        else:
+            out.append("(")
+            out.append(_unparse(node))
+            out.append(")")
+
+    def _emit_sequence(self, nodes, out: List[str]):
+        """写入以逗号分隔的表达式序列"""
+        emit = self._emit_value
+        first = True
+        for item in nodes:
+            if not first:
+                out.append(", ")
+            first = False
+            emit(item, out)
+
+    def _emit_name(self, node: ast.Name, out: List[str]):
+        """变量名"""
+        out.append(node.id)
+
+    def _emit_constant(self, node: ast.Constant, out: List[str]):
+        """常量"""
+        value = node.value
+        if isinstance(value, str):
+            out.append('"')
+            out.append(value)
+            out.append('"')
+        else:
+            out.append(str(value))
+
+    def _emit_list(self, node: ast.List, out: List[str]):
+        """列表字面量"""
+        out.append("Arrays.asList(")
+        self._emit_sequence(node.elts, out)
+        out.append(")")
+
+    def _emit_dict(self, node: ast.Dict, out: List[str]):
+        """字典字面量"""
+        out.append("Map.of(")
+        first = True
+        for key, value in zip(node.keys, node.values):
+            if not first:
+                out.append(", ")
+            first = False
+            self._emit_value(key, out)
+            out.append(", ")
+            self._emit_value(value, out)
+        out.append(")")
+
+    def _emit_binop(self, node: ast.BinOp, out: List[str]):
+        """二元运算"""
+        out.append("(")
+        self._emit_operand(node.left, out)
+        out.append(" ")
+        out.append(self._get_binop(node.op))
+        out.append(" ")
+        self._emit_operand(node.right, out)
+        out.append(")")
+
+    def _emit_compare(self, node: ast.Compare, out: List[str]):
+        """比较运算（仅转换第一个比较）"""
+        if not node.comparators:
+            out.append(_unparse(node))
+            return
+        out.append("(")
+        self._emit_operand(node.left, out)
+        out.append(" ")
+        out.append(self._get_cmpop(node.ops[0]))
+        out.append(" ")
+        self._emit_operand(node.comparators[0], out)
+        out.append(")")
+
+    def _emit_call(self, node: ast.Call, out: List[str]):
+        """函数调用"""
+        self._emit_value(node.func, out)
+        out.append("(")
+        self._emit_sequence(node.args, out)
+        out.append(")")
+
+    def _emit_attribute(self, node: ast.Attribute, out: List[str]):
+        """属性访问"""
+        self._emit_value(node.value, out)
+        out.append(".")
+        out.append(node.attr)
+
+    def _emit_joined_str(self, node: ast.JoinedStr, out: List[str]):
+        """f-string，各部分以+连接"""
+        first = True
+        for value in node.values:
+            if isinstance(value, ast.Constant):
+                if not first:
+                    out.append(" + ")
+                first = False
+                out.append('"')
+                out.append(str(value.value))
+                out.append('"')
+            elif isinstance(value, ast.FormattedValue):
+                if not first:
+                    out.append(" + ")
+                first = False
+                self._emit_value(value.value, out)
 
     def _get_call_code(self, node: ast.Call) -> str:
         """获取函数调用代码"""
-        func_name = self._get_value_code(node.func)
-        args = [self._get_value_code(arg) for arg in node.args]
-        return f"{func_name}({', '.join(args)})"
+        return self._get_value_code(node)
 
     def _get_binop(self, op) -> str:
         """获取二元运算符"""
-        if isinstance(op, ast.Add):
-            return "+"
-        elif isinstance(op, ast.Sub):
-            return "-"
-        elif isinstance(op, ast.Mult):
-            return "*"
-        elif isinstance(op, ast.Div):
-            return "/"
-        elif isinstance(op, ast.Mod):
-            return "%"
-        return str(op)
+        return _BINOPS.get(type(op)) or _PY_OPERATORS.get(type(op)) or str(op)
 
     def _get_cmpop(self, op) -> str:
         """获取比较运算符"""
-        if isinstance(op, ast.Eq):
-            return "=="
-        elif isinstance(op, ast.NotEq):
-            return "!="
-        elif isinstance(op, ast.Lt):
-            return "<"
-        elif isinstance(op, ast.LtE):
-            return "<="
-        elif isinstance(op, ast.Gt):
-            return ">"
-        elif isinstance(op, ast.GtE):
-            return ">="
-        return str(op)
+        return _CMPOPS.get(type(op)) or _PY_OPERATORS.get(type(op)) or str(op)
 
     def _get_type_annotation(self, node) -> str:
         """获取类型注解"""
         if isinstance(node, ast.Name):
-            type_map = {
-                'int': 'int',
-                'str': 'String',
-                'float': 'double',
-                'bool': 'boolean',
-                'list': 'List',
-                'dict': 'Map'
-            }
-            return type_map.get(node.id, 'Object')
-        return 'Object'
+            return self._ANNOTATION_TYPES.get(node.id, self._DEFAULT_TYPE)
+        return self._DEFAULT_TYPE
 
     def _infer_type(self, node) -> str:
         """推断变量类型"""
         if isinstance(node, ast.Constant):
-            if isinstance(node.value, int):
-                return "int"
-            elif isinstance(node.value, float):
-                return "double"
-            elif isinstance(node.value, str):
-                return "String"
-            elif isinstance(node.value, bool):
-                return "boolean"
-            elif node.value is True:
-                return "boolean"
-            elif node.value is False:
-                return "boolean"
+            return self._CONSTANT_TYPES.get(type(node.value), self._DEFAULT_TYPE)
         elif isinstance(node, ast.List):
-            return "List<Object>"
+            return self._LIST_OBJECT_TYPE
         elif isinstance(node, ast.Dict):
-            return "Map<Object, Object>"
-        return "Object"
+            return self._MAP_OBJECT_TYPE
+        return self._DEFAULT_TYPE
+
+
+# 表达式节点类型到代码片段生成方法的映射
+_VALUE_EMITTERS = {
+    ast.Name: JavaStyleConverter._emit_name,
+    ast.Constant: JavaStyleConverter._emit_constant,
+    ast.List: JavaStyleConverter._emit_list,
+    ast.Dict: JavaStyleConverter._emit_dict,
+    ast.BinOp: JavaStyleConverter._emit_binop,
+    ast.Compare: JavaStyleConverter._emit_compare,
+    ast.Call: JavaStyleConverter._emit_call,
+    ast.Attribute: JavaStyleConverter._emit_attribute,
+    ast.JoinedStr: JavaStyleConverter._emit_joined_str,
+}
+
+
+# 按配置特化的转换器类
+_converter_classes: Dict[Any, type] = {}
+
+
+def make_converter(config) -> type:
+    """按转换配置生成特化的转换器类（相同配置复用同一个类）"""
+    converter_class = _converter_classes.get(config)
+    if converter_class is None:
+        default_type = sys.intern(config.default_type)
+        int_type = sys.intern(config.int_type)
+        string_type = sys.intern(config.string_type)
+        float_type = sys.intern(config.float_type)
+        bool_type = sys.intern(config.bool_type)
+
+        converter_class = type(
+            f"JavaStyleConverter_{hash(config) & 0xffffffff:08x}",
+            (JavaStyleConverter,),
+            {
+                '_INDENT_UNIT': "\t" if config.use_tabs else " " * config.indent_size,
+                '_PRINT_FUNCTION': config.print_function,
+                '_PACKAGE_NAME': config.package_name if config.add_package_declaration else None,
+                '_DEFAULT_TYPE': default_type,
+                '_INT_TYPE': int_type,
+                '_STRING_TYPE': string_type,
+                '_LIST_OBJECT_TYPE': sys.intern(f"{config.list_type}<{default_type}>"),
+                '_MAP_OBJECT_TYPE': sys.intern(f"{config.dict_type}<{default_type}, {default_type}>"),
+                '_CONSTANT_TYPES': {
+                    int: int_type,
+                    float: float_type,
+                    str: string_type,
+                    bool: bool_type,
+                },
+                '_ANNOTATION_TYPES': {
+                    'int': int_type,
+                    'str': string_type,
+                    'float': float_type,
+                    'bool': bool_type,
+                    'list': sys.intern(config.list_type),
+                    'dict': sys.intern(config.dict_type),
+                },
+            },
+        )
+        _converter_classes[config] = converter_class
+
+    return converter_class
+
+
+def _convert_uncached(code: str) -> str:
+    """不经缓存直接转换"""
+    converter = make_converter(get_conversion_config())()
+    return converter.convert(code)
+
+
+# 转换结果缓存（首次使用时按配置创建）
+_conversion_cache = None
+
+
+def _get_conversion_cache():
+    """获取转换缓存，遵循cache_enabled/max_cache_size配置"""
+    global _conversion_cache
+    if _conversion_cache is None:
+        config = get_conversion_config()
+        if config.cache_enabled:
+            _conversion_cache = lru_cache(maxsize=config.max_cache_size)(_convert_uncached)
+        else:
+            _conversion_cache = _convert_uncached
+    return _conversion_cache
+
+
+def clear_conversion_cache():
+    """清空转换缓存（配置重新加载后按新配置重建）"""
+    global _conversion_cache
+    _conversion_cache = None
 
 
 def convert_python_to_java_style(code: str) -> str:
     """将Python代码转换为Java风格"""
-    converter = JavaStyleConverter()
-    return converter.convert(code)
+    return _get_conversion_cache()(code)
 
 
 if __name__ == "__main__":
@@ -4,10 +4,18 @@ Pythva错误处理和调试模块
 提供统一的错误处理、日志记录和调试功能
 """
 
+import atexit
+import io
+import os
+import queue
 import sys
-import traceback
 import logging
-from typing import Optional, Dict, Any, List
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional, Dict, Any, List, Deque, Iterator, Tuple
+from types import MappingProxyType
 from enum import Enum
 from pathlib import Path
 
@@ -30,6 +38,7 @@ class ConversionError(Exception):
         self.line_number = line_number
         self.column = column
         self.file_path = file_path
+        self.severity: Optional[ErrorSeverity] = None  # 报告时设置
 
     def __str__(self):
         location = ""
@@ -61,8 +70,18 @@ class ImportError(ConversionError):
 
 
 class PluginError(ConversionError):
-    """插件错误"""
-    pass
+    """插件错误（消息支持%格式参数，首次转换为字符串时才格式化）"""
+
+    def __init__(self, message: str, *format_args, line_number: Optional[int] = None,
+                 column: Optional[int] = None, file_path: Optional[str] = None):
+        super().__init__(message, line_number, column, file_path)
+        self.format_args = format_args
+
+    def __str__(self):
+        if self.format_args:
+            self.args = (self.args[0] % self.format_args,)
+            self.format_args = ()
+        return super().__str__()
 
 
 class ConfigurationError(ConversionError):
@@ -70,6 +89,84 @@ class ConfigurationError(ConversionError):
     pass
 
 
+# 日志格式
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 日志是否已配置（多个ErrorReporter共享同一份日志配置）
+_logging_configured = False
+
+# 将日志队列写入stderr的后台监听器，以及根日志器上对应的队列处理器
+_log_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+# 批处理模式下日志使用的块缓冲输出流
+_batch_log_stream: Optional[io.TextIOWrapper] = None
+
+
+class _BatchStreamHandler(logging.StreamHandler):
+    """批处理模式的日志处理器，不逐条刷新，由shutdown_logging统一刷新"""
+
+    def flush(self):
+        pass
+
+
+def _create_stream_handler() -> logging.StreamHandler:
+    """创建stderr日志处理器：交互运行时按行刷新，批处理时块缓冲"""
+    global _batch_log_stream
+    buffer = getattr(sys.stderr, 'buffer', None)
+    if sys.stderr.isatty() or buffer is None:
+        return logging.StreamHandler(sys.stderr)
+
+    # 与sys.stderr共用底层缓冲区，保证与其他stderr输出的先后顺序
+    _batch_log_stream = io.TextIOWrapper(
+        buffer,
+        encoding=sys.stderr.encoding,
+        errors='backslashreplace',
+        line_buffering=False,
+        write_through=True
+    )
+    return _BatchStreamHandler(_batch_log_stream)
+
+
+def shutdown_logging():
+    """停止日志后台线程，并写出队列中剩余的日志"""
+    global _log_listener, _batch_log_stream
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
+
+    if _batch_log_stream is not None:
+        _batch_log_stream.flush()
+        # 分离而不是关闭，避免关闭sys.stderr的底层缓冲区
+        _batch_log_stream.detach()
+        _batch_log_stream = None
+
+
+def _reset_logging_after_fork():
+    """fork出的子进程不继承日志后台线程：改为直接写入stderr，避免日志滞留在队列中"""
+    global _log_listener, _queue_handler, _batch_log_stream
+    if _log_listener is None:
+        return
+
+    _log_listener = None
+    if _batch_log_stream is not None:
+        # 分离而不是丢弃，避免回收时关闭sys.stderr的底层缓冲区
+        _batch_log_stream.detach()
+        _batch_log_stream = None
+
+    stream_handler = _create_stream_handler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    root_logger = logging.getLogger()
+    root_logger.removeHandler(_queue_handler)
+    root_logger.addHandler(stream_handler)
+    _queue_handler = None
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_logging_after_fork)
+
+
 class ErrorReporter:
     """错误报告器"""
 
@@ -79,39 +176,67 @@ class ErrorReporter:
         self.verbose = verbose
         self.errors: List[ConversionError] = []
         self.warnings: List[str] = []
+        self._error_count = 0
+        self._critical_count = 0
 
         # 配置日志
         self._setup_logging()
 
     def _setup_logging(self):
-        """设置日志记录"""
+        """设置日志记录（全局日志配置只执行一次）"""
+        global _logging_configured
+        if _logging_configured:
+            self.logger = logging.getLogger('pythva')
+            return
+
+        global _log_listener, _queue_handler
         log_level = logging.DEBUG if self.debug_mode else logging.INFO
+
+        # 日志记录只入队，由后台线程写入stderr，避免阻塞转换过程
+        log_queue = queue.SimpleQueue()
+        queue_handler = QueueHandler(log_queue)
+        queue_handler.setFormatter(logging.Formatter('%(message)s'))
         logging.basicConfig(
             level=log_level,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.StreamHandler(sys.stderr)
-            ]
+            handlers=[queue_handler]
         )
+
+        # 宿主程序已配置日志时basicConfig不生效，无需启动后台线程
+        if queue_handler in logging.getLogger().handlers:
+            stream_handler = _create_stream_handler()
+            stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            _log_listener = QueueListener(log_queue, stream_handler)
+            _log_listener.start()
+            _queue_handler = queue_handler
+            atexit.register(shutdown_logging)
+
         self.logger = logging.getLogger('pythva')
+        _logging_configured = True
 
     def report_error(self, error: ConversionError, severity: ErrorSeverity = ErrorSeverity.ERROR):
         """报告错误"""
+        error.severity = severity
         self.errors.append(error)
 
+        if severity == ErrorSeverity.CRITICAL:
+            self._critical_count += 1
+        elif severity == ErrorSeverity.ERROR:
+            self._error_count += 1
+
         if severity == ErrorSeverity.DEBUG and not self.debug_mode:
             return
 
+        # 交由logging在实际输出时才将错误转换为字符串
         if severity == ErrorSeverity.CRITICAL:
-            self.logger.critical(str(error))
+            self.logger.critical('%s', error)
         elif severity == ErrorSeverity.ERROR:
-            self.logger.error(str(error))
+            self.logger.error('%s', error)
         elif severity == ErrorSeverity.WARNING:
-            self.logger.warning(str(error))
+            self.logger.warning('%s', error)
         elif severity == ErrorSeverity.INFO:
-            self.logger.info(str(error))
+            self.logger.info('%s', error)
         else:
-            self.logger.debug(str(error))
+            self.logger.debug('%s', error)
 
     def report_warning(self, message: str, line_number: Optional[int] = None,
                       file_path: Optional[str] = None):
@@ -137,11 +262,8 @@ class ErrorReporter:
         return len(self.errors) > 0
 
     def has_critical_errors(self) -> bool:
-        """是否有严重错误"""
-        return any(
-            ErrorSeverity.ERROR in str(error) or ErrorSeverity.CRITICAL in str(error)
-            for error in self.errors
-        )
+        """是否有严重错误（ERROR或CRITICAL级别）"""
+        return self._error_count > 0 or self._critical_count > 0
 
     def get_error_summary(self) -> str:
         """获取错误摘要"""
@@ -192,49 +314,57 @@ class ErrorReporter:
             f.write(f"\n{self.get_error_summary()}\n")
 
 
+# 跟踪事件字段名, 与 trace_data 中元组的顺序一致
+_TRACE_FIELDS = ('event', 'node_type', 'details', 'line_number')
+# 跟踪事件上限, 超出后丢弃最早的事件
+TRACE_MAX_EVENTS = 1_000_000
+# 无细节时共享的只读空字典, 避免每次调用都分配 {}
+EMPTY_DICT = MappingProxyType({})
+
+
 class DebugTracer:
     """调试跟踪器"""
 
     def __init__(self, enabled: bool = False):
         """初始化调试跟踪器"""
         self.enabled = enabled
-        self.trace_data: List[Dict[str, Any]] = []
+        # 每个事件存为 (event, node_type, details, line_number) 元组
+        self.trace_data: Deque[Tuple[str, str, Any, int]] = deque(maxlen=TRACE_MAX_EVENTS)
 
     def trace(self, event: str, node_type: str = "", details: Dict[str, Any] = None):
         """添加跟踪信息"""
         if not self.enabled:
             return
 
-        trace_info = {
-            'event': event,
-            'node_type': node_type,
-            'details': details or {},
-            'line_number': traceback.extract_stack()[-2].lineno
-        }
-
-        self.trace_data.append(trace_info)
+        self.trace_data.append(
+            (event, node_type, details or EMPTY_DICT, sys._getframe(1).f_lineno)
+        )
 
     def get_trace_report(self) -> str:
         """获取跟踪报告"""
         if not self.trace_data:
             return "无跟踪信息"
 
-        report = "调试跟踪报告:\n"
-        for i, trace in enumerate(self.trace_data, 1):
-            report += f"  {i}. {trace['event']}"
-            if trace['node_type']:
-                report += f" ({trace['node_type']})"
-            if trace['details']:
-                report += f" - {trace['details']}"
-            report += f" (行: {trace['line_number']})\n"
+        parts = ["调试跟踪报告:\n"]
+        for i, (event, node_type, details, line_number) in enumerate(self.trace_data, 1):
+            parts.append(f"  {i}. {event}")
+            if node_type:
+                parts.append(f" ({node_type})")
+            if details:
+                parts.append(f" - {details}")
+            parts.append(f" (行: {line_number})\n")
 
-        return report
+        return "".join(parts)
 
     def save_trace(self, file_path: str):
         """保存跟踪信息到文件"""
         import json
+        records = [
+            dict(zip(_TRACE_FIELDS, (event, node_type, dict(details), line_number)))
+            for event, node_type, details, line_number in self.trace_data
+        ]
         with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(self.trace_data, f, indent=2, ensure_ascii=False)
+            json.dump(records, f, indent=2, ensure_ascii=False)
 
 
 def handle_conversion_error(error: Exception, reporter: ErrorReporter,
@@ -264,22 +394,34 @@ def create_type_error(message: str, line_number: Optional[int] = None,
     return TypeInferenceError(message, line_number, file_path=file_path)
 
 
-# 全局错误报告器
-_global_reporter: Optional[ErrorReporter] = None
+# 当前上下文的错误报告器（每个线程/请求上下文各自独立）
+_current_reporter: "ContextVar[ErrorReporter]" = ContextVar("pythva_error_reporter")
 
 
 def get_error_reporter() -> ErrorReporter:
-    """获取全局错误报告器"""
-    global _global_reporter
-    if _global_reporter is None:
-        _global_reporter = ErrorReporter()
-    return _global_reporter
+    """获取当前上下文的错误报告器"""
+    try:
+        return _current_reporter.get()
+    except LookupError:
+        reporter = ErrorReporter()
+        _current_reporter.set(reporter)
+        return reporter
 
 
 def reset_error_reporter():
-    """重置全局错误报告器"""
-    global _global_reporter
-    _global_reporter = ErrorReporter()
+    """重置当前上下文的错误报告器"""
+    _current_reporter.set(ErrorReporter())
+
+
+@contextmanager
+def collect_errors() -> Iterator[ErrorReporter]:
+    """在代码块内使用独立的错误报告器并返回它，退出时恢复原报告器"""
+    reporter = ErrorReporter()
+    token = _current_reporter.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current_reporter.reset(token)
 
 
 if __name__ == "__main__":
@@ -6,7 +6,40 @@ Pythva语法映射器模块
 
 import ast
 import re
-from typing import Dict, List, Tuple, Any, Optional
+from functools import lru_cache
+from itertools import chain
+from typing import Dict, List, Set, Tuple, Any, Optional
+
+try:
+    from .config import get_conversion_config
+    from ._parse import parse_cached
+except ImportError:
+    from config import get_conversion_config
+    from _parse import parse_cached
+
+
+# 需要导入语句的Java类型
+_IMPORT_REQUIRED = frozenset({
+    'List', 'Map', 'Set', 'ArrayList', 'HashMap', 'HashSet',
+    'Arrays', 'Collections', 'IntStream'
+})
+
+
+# 二元运算符映射
+_BINOP_MAP: Dict[type, str] = {
+    ast.Add: '+',
+    ast.Sub: '-',
+    ast.Mult: '*',
+    ast.Div: '/',
+    ast.Mod: '%',
+    ast.Pow: '**',
+    ast.LShift: '<<',
+    ast.RShift: '>>',
+    ast.BitOr: '|',
+    ast.BitXor: '^',
+    ast.BitAnd: '&',
+    ast.FloorDiv: '//'
+}
 
 
 class SyntaxMapper:
@@ -70,9 +103,7 @@ class SyntaxMapper:
     @classmethod
     def map_function(cls, func_name: str, context: str = "") -> str:
         """映射Python函数到Java方法"""
-        if func_name in cls.FUNCTION_MAPPING:
-            return cls.FUNCTION_MAPPING[func_name]
-        return func_name
+        return cls.FUNCTION_MAPPING.get(func_name, func_name)
 
     @classmethod
     def map_magic_method(cls, magic_method: str) -> str:
@@ -82,35 +113,28 @@ class SyntaxMapper:
     @classmethod
     def needs_import(cls, java_type: str) -> bool:
         """判断是否需要导入"""
-        import_required_types = {
-            'List', 'Map', 'Set', 'ArrayList', 'HashMap', 'HashSet',
-            'Arrays', 'Collections', 'IntStream'
-        }
-        return java_type in import_required_types
+        return java_type in _IMPORT_REQUIRED
+
+    # 类型名到所需导入语句的映射
+    TYPE_IMPORTS = {
+        'List': ('import java.util.List;', 'import java.util.ArrayList;'),
+        'Map': ('import java.util.Map;', 'import java.util.HashMap;'),
+        'Set': ('import java.util.Set;', 'import java.util.HashSet;'),
+        'Arrays': ('import java.util.Arrays;',),
+        'Collections': ('import java.util.Collections;',),
+    }
 
     @classmethod
     def get_required_imports(cls, code: str) -> List[str]:
         """获取需要的导入语句"""
         imports = set()
 
-        # 分析代码中的类型使用
-        for type_name in ['List', 'Map', 'Set', 'Arrays', 'Collections']:
+        # 分析代码中的类型使用（子串查找在首次命中时即返回，比单遍正则扫描更快）
+        for type_name, type_imports in cls.TYPE_IMPORTS.items():
             if type_name in code:
-                if type_name == 'List':
-                    imports.add('import java.util.List;')
-                    imports.add('import java.util.ArrayList;')
-                elif type_name == 'Map':
-                    imports.add('import java.util.Map;')
-                    imports.add('import java.util.HashMap;')
-                elif type_name == 'Set':
-                    imports.add('import java.util.Set;')
-                    imports.add('import java.util.HashSet;')
-                elif type_name == 'Arrays':
-                    imports.add('import java.util.Arrays;')
-                elif type_name == 'Collections':
-                    imports.add('import java.util.Collections;')
-
-        return sorted(list(imports))
+                imports.update(type_imports)
+
+        return sorted(imports)
 
 
 class EnhancedConverter(ast.NodeVisitor):
@@ -118,7 +142,7 @@ class EnhancedConverter(ast.NodeVisitor):
 
     def __init__(self):
         self.mapper = SyntaxMapper()
-        self.imports: List[str] = []
+        self.imports: Set[str] = set()
         self.lines: List[str] = []
         self.indent_level = 0
         self.in_class = False
@@ -126,31 +150,35 @@ class EnhancedConverter(ast.NodeVisitor):
 
     def convert(self, code: str) -> str:
         """转换代码并添加必要的导入"""
-        tree = ast.parse(code)
-
-        # 第一遍：收集类型信息和导入需求
-        self._collect_info(tree)
+        tree = parse_cached(code)
 
-        # 第二遍：生成Java风格代码
+        # 单遍生成Java风格代码，导入需求在生成集合字面量时同步记录
         self.visit(tree)
 
-        # 组合导入和代码
-        all_lines = self.imports + [''] + self.lines if self.imports else self.lines
-        return '\n'.join(all_lines)
-
-    def _collect_info(self, tree: ast.AST):
-        """收集类型信息和导入需求"""
-        for node in ast.walk(tree):
-            if isinstance(node, ast.List):
-                self.imports.append('import java.util.List;')
-                self.imports.append('import java.util.ArrayList;')
-            elif isinstance(node, ast.Dict):
-                self.imports.append('import java.util.Map;')
-                self.imports.append('import java.util.HashMap;')
-            elif isinstance(node, ast.Name):
-                if node.id in ['print', 'len', 'range', 'sum', 'max', 'min']:
-                    # 这些函数需要特殊处理
-                    pass
+        # 组合导入和代码（直接拼接，不构造中间列表）
+        if not self.imports:
+            return '\n'.join(self.lines)
+        return '\n'.join(chain(sorted(self.imports), ('',), self.lines))
+
+    def _note_list(self):
+        """记录列表字面量所需的导入"""
+        self.imports.add('import java.util.List;')
+        self.imports.add('import java.util.ArrayList;')
+
+    def _note_dict(self):
+        """记录字典字面量所需的导入"""
+        self.imports.add('import java.util.Map;')
+        self.imports.add('import java.util.HashMap;')
+
+    def _note_skipped(self, node):
+        """记录未被生成代码访问到的子树中集合字面量所需的导入"""
+        if node is None:
+            return
+        for child in ast.walk(node):
+            if isinstance(child, ast.List):
+                self._note_list()
+            elif isinstance(child, ast.Dict):
+                self._note_dict()
 
     def add_line(self, line: str, indent: bool = True):
         """添加一行代码"""
@@ -175,14 +203,15 @@ class EnhancedConverter(ast.NodeVisitor):
         if node.module:
             for alias in node.names:
                 if node.module == 'typing' and alias.name == 'List':
-                    self.imports.append('import java.util.List;')
+                    self.imports.add('import java.util.List;')
                 elif node.module == 'typing' and alias.name == 'Dict':
-                    self.imports.append('import java.util.Map;')
+                    self.imports.add('import java.util.Map;')
                 else:
                     self.add_line(f"// from {node.module} import {alias.name} (需要手动转换)")
 
     def visit_List(self, node: ast.List):
         """处理列表字面量"""
+        self._note_list()
         if node.elts:
             elements = []
             for elt in node.elts:
@@ -192,6 +221,7 @@ class EnhancedConverter(ast.NodeVisitor):
 
     def visit_Dict(self, node: ast.Dict):
         """处理字典字面量"""
+        self._note_dict()
         if node.keys and node.values:
             items = []
             for key, value in zip(node.keys, node.values):
@@ -204,6 +234,8 @@ class EnhancedConverter(ast.NodeVisitor):
     def visit_Call(self, node: ast.Call):
         """处理函数调用"""
         func_name = self._get_value_code(node.func)
+        for keyword in node.keywords:
+            self._note_skipped(keyword.value)
 
         # 特殊函数映射
         if func_name == 'print':
@@ -211,6 +243,8 @@ class EnhancedConverter(ast.NodeVisitor):
             return f"System.out.println({', '.join(args)})"
         elif func_name == 'len':
             if node.args:
+                for extra in node.args[1:]:
+                    self._note_skipped(extra)
                 arg = self._get_value_code(node.args[0])
                 return f"{arg}.size()"
         elif func_name == 'range':
@@ -227,50 +261,78 @@ class EnhancedConverter(ast.NodeVisitor):
 
     def _get_value_code(self, node) -> str:
         """获取值的代码表示（简化版）"""
-        if isinstance(node, ast.Name):
-            return node.id
-        elif isinstance(node, ast.Constant):
-            if isinstance(node.value, str):
-                return f'"{node.value}"'
-            return str(node.value)
-        elif isinstance(node, ast.List):
-            return self.visit_List(node)
-        elif isinstance(node, ast.Dict):
-            return self.visit_Dict(node)
-        elif isinstance(node, ast.Call):
-            return self.visit_Call(node)
-        elif isinstance(node, ast.BinOp):
-            left = self._get_value_code(node.left)
-            right = self._get_value_code(node.right)
-            op = self._get_binop(node.op)
-            return f"({left} {op} {right})"
+        handler = _VALUE_HANDLERS.get(type(node))
+        if handler is not None:
+            return handler(self, node)
+        self._note_skipped(node)
         return str(node)
 
+    def _get_name_code(self, node: ast.Name) -> str:
+        """变量名"""
+        return node.id
+
+    def _get_constant_code(self, node: ast.Constant) -> str:
+        """常量"""
+        if isinstance(node.value, str):
+            return f'"{node.value}"'
+        return str(node.value)
+
+    def _get_binop_code(self, node: ast.BinOp) -> str:
+        """二元运算"""
+        left = self._get_value_code(node.left)
+        right = self._get_value_code(node.right)
+        op = self._get_binop(node.op)
+        return f"({left} {op} {right})"
+
     def _get_binop(self, op) -> str:
         """获取二元运算符"""
-        op_map = {
-            ast.Add: '+',
-            ast.Sub: '-',
-            ast.Mult: '*',
-            ast.Div: '/',
-            ast.Mod: '%',
-            ast.Pow: '**',
-            ast.LShift: '<<',
-            ast.RShift: '>>',
-            ast.BitOr: '|',
-            ast.BitXor: '^',
-            ast.BitAnd: '&',
-            ast.FloorDiv: '//'
-        }
-        return op_map.get(type(op), str(op))
+        return _BINOP_MAP.get(type(op), str(op))
 
 
-def convert_with_mapping(code: str) -> str:
-    """使用语法映射进行转换"""
+# 表达式节点类型到代码生成方法的映射
+_VALUE_HANDLERS = {
+    ast.Name: EnhancedConverter._get_name_code,
+    ast.Constant: EnhancedConverter._get_constant_code,
+    ast.List: EnhancedConverter.visit_List,
+    ast.Dict: EnhancedConverter.visit_Dict,
+    ast.Call: EnhancedConverter.visit_Call,
+    ast.BinOp: EnhancedConverter._get_binop_code,
+}
+
+
+def _convert_uncached(code: str) -> str:
+    """不经缓存直接进行映射转换"""
     converter = EnhancedConverter()
     return converter.convert(code)
 
 
+# 映射转换结果缓存（首次使用时按配置创建）
+_mapping_cache = None
+
+
+def _get_mapping_cache():
+    """获取映射转换缓存，遵循cache_enabled/max_cache_size配置"""
+    global _mapping_cache
+    if _mapping_cache is None:
+        config = get_conversion_config()
+        if config.cache_enabled:
+            _mapping_cache = lru_cache(maxsize=config.max_cache_size)(_convert_uncached)
+        else:
+            _mapping_cache = _convert_uncached
+    return _mapping_cache
+
+
+def clear_mapping_cache():
+    """清空映射转换缓存（配置重新加载后按新配置重建）"""
+    global _mapping_cache
+    _mapping_cache = None
+
+
+def convert_with_mapping(code: str) -> str:
+    """使用语法映射进行转换"""
+    return _get_mapping_cache()(code)
+
+
 if __name__ == "__main__":
     # 测试语法映射
     test_code = '''
@@ -6,16 +6,47 @@ Pythva性能优化和缓存模块
 
 import hashlib
 import json
+import re
+import sys
 import time
-import pickle
+from collections import OrderedDict
 from typing import Dict, Any, Optional, Tuple, List
 from pathlib import Path
-from functools import lru_cache
 from dataclasses import dataclass
 import ast
 
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
-@dataclass
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 短于此长度的代码在内存缓存中以内置hash()作为键
+SHORT_CODE_LENGTH = 256
+
+# dataclass的slots参数需要Python 3.10+
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+def _dump_json_bytes(data: Any) -> bytes:
+    """序列化为JSON字节（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _load_json_bytes(data: bytes) -> Any:
+    """从JSON字节反序列化（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class CacheEntry:
     """缓存条目"""
     code_hash: str
@@ -42,53 +73,70 @@ class ConversionCache:
         """初始化缓存管理器"""
         self.max_size = max_size
         self.cache_file = cache_file
-        self.cache: Dict[str, CacheEntry] = {}
+        # 按最近使用顺序排列，最久未使用的条目在最前
+        self.cache: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # 被驱逐条目的对象池，插入新条目时复用
+        self._pool: List[CacheEntry] = []
         self._load_cache()
 
-    def _get_code_hash(self, code: str) -> str:
-        """计算代码哈希值"""
-        return hashlib.md5(code.encode('utf-8')).hexdigest()
+    def hash_code(self, code: str) -> str:
+        """计算代码哈希值（优先使用xxHash，否则使用BLAKE2b）"""
+        # 不落盘的缓存对短代码直接使用内置hash()，其值仅在当前进程内稳定
+        if len(code) < SHORT_CODE_LENGTH and not self.cache_file:
+            return f"s{hash(code)}"
+        data = code.encode('utf-8')
+        if xxhash is not None:
+            return xxhash.xxh3_128_hexdigest(data)
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
 
     def get(self, code: str) -> Optional[str]:
         """从缓存获取转换结果"""
-        code_hash = self._get_code_hash(code)
-
-        if code_hash in self.cache:
-            entry = self.cache[code_hash]
+        return self.get_by_hash(self.hash_code(code))
+
+    def get_by_hash(self, code_hash: str) -> Optional[str]:
+        """按代码哈希值从缓存获取转换结果"""
+        entry = self.cache.get(code_hash)
+        if entry is not None:
+            # LRU顺序由OrderedDict维护，命中时不再记录访问时间
+            self.cache.move_to_end(code_hash)
             entry.access_count += 1
-            entry.last_accessed = time.time()
             return entry.converted_code
 
         return None
 
     def put(self, code: str, converted_code: str):
         """将转换结果存入缓存"""
-        code_hash = self._get_code_hash(code)
-
-        # 检查缓存大小
-        if len(self.cache) >= self.max_size and code_hash not in self.cache:
-            self._evict_oldest()
-
-        entry = CacheEntry(
-            code_hash=code_hash,
-            converted_code=converted_code,
-            timestamp=time.time()
-        )
-
-        self.cache[code_hash] = entry
+        self.put_by_hash(self.hash_code(code), converted_code)
+
+    def put_by_hash(self, code_hash: str, converted_code: str):
+        """按代码哈希值将转换结果存入缓存"""
+        entry = self.cache.get(code_hash)
+        if entry is None:
+            # 检查缓存大小，驱逐最久未使用的条目
+            if self.cache and len(self.cache) >= self.max_size:
+                self._evict_oldest()
+
+            if self._pool:
+                entry = self._pool.pop()
+            else:
+                entry = CacheEntry(code_hash=code_hash, converted_code=converted_code,
+                                   timestamp=0.0)
+            self.cache[code_hash] = entry
+        else:
+            self.cache.move_to_end(code_hash)
+
+        entry.code_hash = code_hash
+        entry.converted_code = converted_code
+        entry.timestamp = time.time()
+        entry.access_count = 0
+        entry.last_accessed = 0.0
 
     def _evict_oldest(self):
-        """驱逐最老的缓存条目"""
-        if not self.cache:
-            return
-
-        # 基于最后访问时间和访问次数的综合评分
-        oldest_entry = min(
-            self.cache.values(),
-            key=lambda e: (e.last_accessed, -e.access_count)
-        )
-
-        del self.cache[oldest_entry.code_hash]
+        """驱逐最久未使用的条目，并将其放回对象池"""
+        _, entry = self.cache.popitem(last=False)
+        # 释放对转换结果的引用，避免池中条目延长其生命周期
+        entry.converted_code = ''
+        self._pool.append(entry)
 
     def _load_cache(self):
         """从文件加载缓存"""
@@ -97,7 +145,7 @@ class ConversionCache:
 
         try:
             with open(self.cache_file, 'rb') as f:
-                data = pickle.load(f)
+                data = _load_json_bytes(f.read())
 
             for entry_data in data:
                 entry = CacheEntry(**entry_data)
@@ -105,7 +153,7 @@ class ConversionCache:
 
         except Exception:
             # 缓存文件损坏，重置缓存
-            self.cache = {}
+            self.cache = OrderedDict()
 
     def save_cache(self):
         """保存缓存到文件"""
@@ -124,7 +172,7 @@ class ConversionCache:
                 })
 
             with open(self.cache_file, 'wb') as f:
-                pickle.dump(cache_data, f)
+                f.write(_dump_json_bytes(cache_data))
 
         except Exception:
             pass  # 保存失败时静默处理
@@ -132,6 +180,7 @@ class ConversionCache:
     def clear(self):
         """清空缓存"""
         self.cache.clear()
+        self._pool.clear()
 
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
@@ -151,6 +200,10 @@ class ConversionCache:
         }
 
 
+# 括号字符
+_PAREN_RE = re.compile(r'[()]')
+
+
 class CodeOptimizer:
     """代码优化器"""
 
@@ -181,20 +234,50 @@ class CodeOptimizer:
         return optimized_code
 
     def _remove_redundant_parentheses(self, code: str) -> str:
-        """移除多余的括号"""
-        # 简单的括号简化逻辑
-        import re
-
-        # 移除多余的嵌套括号
-        patterns = [
-            (r'\(\(([^()]+)\)\)', r'(\1)'),  # ((expr)) -> (expr)
-            (r'\(\(([^()]*)\)\)', r'(\1)'),   # ((expr)) -> (expr)
-        ]
+        """移除多余的括号: ((expr)) -> (expr)，expr中不含括号"""
+        if '((' not in code:
+            return code
+
+        # 单遍扫描所有括号并配对。由内向外判断每对括号：
+        # collapsible表示该括号对（连同其紧贴的内层括号链）最内层不含其他括号，
+        # 若某对括号紧贴包裹一个collapsible的括号对，则外层是多余的
+        stack: List[int] = []
+        has_child: Dict[int, bool] = {}
+        collapsible: Dict[int, bool] = {}
+        closing_of: Dict[int, int] = {}
+        removed: List[int] = []
+
+        for match in _PAREN_RE.finditer(code):
+            pos = match.start()
+            if code[pos] == '(':
+                if stack:
+                    has_child[stack[-1]] = True
+                stack.append(pos)
+                continue
+
+            if not stack:
+                continue
+            start = stack.pop()
+            closing_of[start] = pos
+            inner = start + 1
+            if closing_of.get(inner) == pos - 1 and collapsible[inner]:
+                collapsible[start] = True
+                removed.append(start)
+                removed.append(pos)
+            else:
+                collapsible[start] = not has_child.get(start, False)
 
-        for pattern, replacement in patterns:
-            code = re.sub(pattern, replacement, code)
+        if not removed:
+            return code
 
-        return code
+        removed.sort()
+        parts = []
+        last = 0
+        for pos in removed:
+            parts.append(code[last:pos])
+            last = pos + 1
+        parts.append(code[last:])
+        return ''.join(parts)
 
     def _simplify_expressions(self, code: str) -> str:
         """简化表达式"""
@@ -272,6 +355,15 @@ class PerformanceMonitor:
         self.metrics = PerformanceMetrics()
 
 
+# (use_enhanced, optimize) 到缓存键后缀的映射
+_CACHE_KEY_SUFFIXES = {
+    (False, False): ':basic',
+    (False, True): ':basic+opt',
+    (True, False): ':enhanced',
+    (True, True): ':enhanced+opt',
+}
+
+
 class OptimizedConverter:
     """优化的转换器，集成缓存和性能监控"""
 
@@ -294,9 +386,12 @@ class OptimizedConverter:
         """转换代码（带缓存和优化）"""
         self.monitor.start_conversion()
 
-        # 尝试从缓存获取
+        # 尝试从缓存获取（哈希只计算一次，未命中时存入缓存复用）
+        # 键中包含转换模式和优化开关，不同选项的结果互不覆盖
+        code_hash = None
         if self.cache:
-            cached_result = self.cache.get(code)
+            code_hash = self.cache.hash_code(code) + _CACHE_KEY_SUFFIXES[bool(use_enhanced), bool(optimize)]
+            cached_result = self.cache.get_by_hash(code_hash)
             if cached_result:
                 self.monitor.record_cache_hit()
                 self.monitor.end_conversion()
@@ -317,7 +412,7 @@ class OptimizedConverter:
 
             # 存入缓存
             if self.cache:
-                self.cache.put(code, converted_code)
+                self.cache.put_by_hash(code_hash, converted_code)
 
         except Exception as e:
             self.monitor.end_conversion()
@@ -4,20 +4,27 @@ Pythva插件基类和插件管理器
 定义插件接口和插件系统核心功能
 """
 
-import importlib
-import inspect
 import os
+import sys
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional, Type
-from pathlib import Path
+from typing import ClassVar, Dict, List, Any, Optional, Tuple, Type
 
 from ..errors import PluginError, get_error_reporter
 from ..config import PluginConfig
 
 
+def noop(func):
+    """标记原样返回代码的预处理/后处理方法，构建流水线时将其跳过"""
+    func._is_noop = True
+    return func
+
+
 class Plugin(ABC):
     """插件基类"""
 
+    # 受信任插件在同一个try块中连续执行，任一失败时整组结果被丢弃
+    trusted = False
+
     def __init__(self, name: str, version: str = "1.0.0", description: str = ""):
         """初始化插件"""
         self.name = name
@@ -61,12 +68,17 @@ class Plugin(ABC):
 class ConversionPlugin(Plugin):
     """转换插件基类"""
 
+    # 转换插件标记，注册时用于代替对ABC的isinstance检查
+    _is_conversion: ClassVar[bool] = True
+
     @abstractmethod
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理代码"""
         return code
 
     @abstractmethod
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理代码"""
         return code
@@ -82,182 +94,285 @@ class PluginManager:
     def __init__(self, plugin_config: Optional[PluginConfig] = None):
         """初始化插件管理器"""
         self.plugin_config = plugin_config or PluginConfig()
-        self.plugins: Dict[str, Plugin] = {}
-        self.conversion_plugins: List[ConversionPlugin] = []
+        self._plugins: Dict[str, Plugin] = {}
+        # 插件名到来源（"builtin"、插件文件路径或"manual"）的映射
+        self._plugin_sources: Dict[str, str] = {}
+        self.conversion_plugins: Dict[str, ConversionPlugin] = {}
+        # 已启用转换插件的缓存，插件注册或启停状态变化时失效
+        self._enabled_cache: Optional[Tuple[ConversionPlugin, ...]] = None
+        # 预处理/后处理流水线：(受信任步骤, 其他步骤)，每个步骤为 (插件名, 绑定方法)，
+        # 随上面的缓存一起重建，不含noop方法
+        self._preprocess_steps: Tuple[Tuple[Tuple[str, Any], ...], ...] = ((), ())
+        self._postprocess_steps: Tuple[Tuple[Tuple[str, Any], ...], ...] = ((), ())
         self.error_reporter = get_error_reporter()
 
-        # 加载插件
-        self._load_plugins()
+        # 配置中启用的插件名（驻留字符串），每次加载插件时按配置重建
+        self._enabled_names: frozenset = frozenset()
+
+        # 插件在首次使用时才加载
+        self._loaded = False
+
+    @property
+    def plugins(self) -> Dict[str, Plugin]:
+        """已注册的插件（访问时触发加载）"""
+        self._ensure_loaded()
+        return self._plugins
+
+    def _ensure_loaded(self):
+        """确保插件已加载"""
+        if not self._loaded:
+            self._loaded = True
+            self._load_plugins()
 
     def _load_plugins(self):
         """加载插件"""
-        # 加载内置插件
-        self._load_builtin_plugins()
+        self._enabled_names = frozenset(map(sys.intern, self.plugin_config.enabled_plugins))
+
+        for plugin, source in self._discover_plugins():
+            self.register_plugin(plugin, source)
+
+    def _discover_plugins(self) -> List[Tuple[Plugin, str]]:
+        """发现内置插件和外部插件，返回 (插件, 来源) 列表，来源为"builtin"或插件文件路径"""
+        discovered = self._load_builtin_plugins()
 
-        # 加载外部插件
         for plugin_path in self.plugin_config.plugin_paths:
-            self._load_external_plugins(plugin_path)
+            discovered.extend(self._load_external_plugins(plugin_path))
 
-    def _load_builtin_plugins(self):
+        return discovered
+
+    def _load_builtin_plugins(self) -> List[Tuple[Plugin, str]]:
         """加载内置插件"""
         try:
             from .builtin import get_builtin_plugins
-            builtin_plugins = get_builtin_plugins()
-
-            for plugin in builtin_plugins:
-                self.register_plugin(plugin)
-
         except ImportError:
-            pass
+            return []
+
+        return [(plugin, "builtin") for plugin in get_builtin_plugins()]
 
-    def _load_external_plugins(self, plugin_path: str):
+    def _load_external_plugins(self, plugin_path: str) -> List[Tuple[Plugin, str]]:
         """加载外部插件"""
         if not os.path.exists(plugin_path):
-            return
+            return []
 
         if os.path.isfile(plugin_path):
-            self._load_plugin_from_file(plugin_path)
+            return self._load_plugin_from_file(plugin_path)
         elif os.path.isdir(plugin_path):
-            self._load_plugins_from_directory(plugin_path)
+            return self._load_plugins_from_directory(plugin_path)
+        return []
 
-    def _load_plugin_from_file(self, file_path: str):
+    def _load_plugin_from_file(self, file_path: str) -> List[Tuple[Plugin, str]]:
         """从文件加载插件"""
         try:
             # 这里可以实现动态加载插件的逻辑
-            pass
+            return []
         except Exception as e:
             self.error_reporter.report_error(
-                PluginError(f"无法加载插件文件 {file_path}: {e}")
+                PluginError("无法加载插件文件 %s: %s", file_path, e)
             )
+            return []
 
-    def _load_plugins_from_directory(self, dir_path: str):
+    def _load_plugins_from_directory(self, dir_path: str) -> List[Tuple[Plugin, str]]:
         """从目录加载插件"""
-        plugins_dir = Path(dir_path)
-
-        for plugin_file in plugins_dir.glob("*.py"):
-            if plugin_file.name.startswith("__"):
-                continue
-
+        try:
+            with os.scandir(dir_path) as it:
+                # 与glob("*.py")一致，跳过隐藏文件
+                plugin_files = [entry.path for entry in it
+                                if entry.name.endswith(".py")
+                                and not entry.name.startswith(("__", "."))]
+        except OSError:
+            return []
+
+        discovered = []
+        for plugin_file in plugin_files:
             try:
-                self._load_plugin_from_file(str(plugin_file))
+                discovered.extend(self._load_plugin_from_file(plugin_file))
             except Exception as e:
                 self.error_reporter.report_error(
-                    PluginError(f"无法加载插件 {plugin_file}: {e}")
+                    PluginError("无法加载插件 %s: %s", plugin_file, e)
                 )
-
-    def register_plugin(self, plugin: Plugin):
-        """注册插件"""
-        if plugin.name in self.plugins:
+        return discovered
+
+    def _invalidate_enabled_cache(self):
+        """使已启用转换插件的缓存失效"""
+        self._enabled_cache = None
+
+    def register_plugin(self, plugin: Plugin, source: str = "manual"):
+        """注册插件（source记录插件来源，供reload_plugins比较）"""
+        self._ensure_loaded()
+        # 驻留插件名，后续按名查找时可直接比较指针
+        name = plugin.name = sys.intern(plugin.name)
+        if name in self._plugins:
             self.error_reporter.report_warning(
-                f"插件 '{plugin.name}' 已被注册，将被覆盖"
+                f"插件 '{name}' 已被注册，将被覆盖"
             )
 
-        self.plugins[plugin.name] = plugin
+        self._plugins[name] = plugin
+        self._plugin_sources[name] = source
 
-        # 如果是转换插件，添加到转换插件列表
-        if isinstance(plugin, ConversionPlugin):
-            self.conversion_plugins.append(plugin)
+        # 如果是转换插件，添加到转换插件表（同名插件被替换）
+        if getattr(plugin, '_is_conversion', False):
+            self.conversion_plugins[name] = plugin
+            self._invalidate_enabled_cache()
+        elif self.conversion_plugins.pop(name, None) is not None:
+            self._invalidate_enabled_cache()
 
         # 如果插件在启用列表中，激活它
-        if plugin.name in self.plugin_config.enabled_plugins:
-            self.enable_plugin(plugin.name)
+        if name in self._enabled_names:
+            self.enable_plugin(name)
 
     def unregister_plugin(self, plugin_name: str) -> bool:
         """注销插件"""
-        if plugin_name not in self.plugins:
+        self._ensure_loaded()
+        if plugin_name not in self._plugins:
             return False
 
-        plugin = self.plugins[plugin_name]
+        plugin = self._plugins[plugin_name]
 
         # 停用插件
         if plugin.is_activated():
             plugin.deactivate()
 
-        # 从列表中移除
-        if plugin in self.conversion_plugins:
-            self.conversion_plugins.remove(plugin)
+        # 从转换插件表中移除
+        if self.conversion_plugins.pop(plugin_name, None) is not None:
+            self._invalidate_enabled_cache()
 
-        del self.plugins[plugin_name]
+        del self._plugins[plugin_name]
+        self._plugin_sources.pop(plugin_name, None)
         return True
 
     def enable_plugin(self, plugin_name: str) -> bool:
         """启用插件"""
-        if plugin_name not in self.plugins:
+        self._ensure_loaded()
+        if plugin_name not in self._plugins:
             return False
 
-        plugin = self.plugins[plugin_name]
+        plugin = self._plugins[plugin_name]
 
         if plugin.activate():
             plugin.enabled = True
+            self._invalidate_enabled_cache()
             return True
 
         return False
 
     def disable_plugin(self, plugin_name: str) -> bool:
         """禁用插件"""
-        if plugin_name not in self.plugins:
+        self._ensure_loaded()
+        if plugin_name not in self._plugins:
             return False
 
-        plugin = self.plugins[plugin_name]
+        plugin = self._plugins[plugin_name]
 
         if plugin.deactivate():
             plugin.enabled = False
+            self._invalidate_enabled_cache()
             return True
 
         return False
 
     def get_plugin(self, plugin_name: str) -> Optional[Plugin]:
         """获取插件"""
-        return self.plugins.get(plugin_name)
+        self._ensure_loaded()
+        return self._plugins.get(plugin_name)
 
     def get_all_plugins(self) -> Dict[str, Plugin]:
         """获取所有插件"""
-        return self.plugins.copy()
-
-    def get_conversion_plugins(self) -> List[ConversionPlugin]:
-        """获取所有转换插件"""
-        return [p for p in self.conversion_plugins if p.enabled]
+        self._ensure_loaded()
+        return self._plugins.copy()
+
+    def get_conversion_plugins(self) -> Tuple[ConversionPlugin, ...]:
+        """获取所有已启用的转换插件"""
+        # 缓存只在经由管理器启停插件时失效，直接修改plugin.enabled不会生效
+        enabled = self._enabled_cache
+        if enabled is None:
+            self._ensure_loaded()
+            enabled = tuple(p for p in self.conversion_plugins.values() if p.enabled)
+            self._preprocess_steps = _build_steps(enabled, 'preprocess')
+            self._postprocess_steps = _build_steps(enabled, 'postprocess')
+            self._enabled_cache = enabled
+        return enabled
 
     def list_plugins(self) -> List[Dict[str, str]]:
         """列出所有插件信息"""
-        return [plugin.get_info() for plugin in self.plugins.values()]
+        self._ensure_loaded()
+        return [plugin.get_info() for plugin in self._plugins.values()]
 
     def preprocess_code(self, code: str) -> str:
         """预处理代码"""
-        for plugin in self.get_conversion_plugins():
+        if self._enabled_cache is None:
+            self.get_conversion_plugins()
+        trusted, untrusted = self._preprocess_steps
+        if not trusted and not untrusted:
+            return code
+
+        return self._run_steps(code, trusted, untrusted, "预处理")
+
+    def postprocess_code(self, code: str) -> str:
+        """后处理代码"""
+        if self._enabled_cache is None:
+            self.get_conversion_plugins()
+        trusted, untrusted = self._postprocess_steps
+        if not trusted and not untrusted:
+            return code
+
+        return self._run_steps(code, trusted, untrusted, "后处理")
+
+    def _run_steps(self, code: str, trusted, untrusted, stage: str) -> str:
+        """依次执行受信任步骤和其他步骤"""
+        if trusted:
             try:
-                code = plugin.preprocess(code)
+                result = code
+                for name, step in trusted:
+                    result = step(result)
+                code = result
             except Exception as e:
                 self.error_reporter.report_error(
-                    PluginError(f"插件 {plugin.name} 预处理失败: {e}")
+                    PluginError("插件 %s %s失败: %s", name, stage, e)
                 )
 
-        return code
-
-    def postprocess_code(self, code: str) -> str:
-        """后处理代码"""
-        for plugin in self.get_conversion_plugins():
+        for name, step in untrusted:
             try:
-                code = plugin.postprocess(code)
+                code = step(code)
             except Exception as e:
                 self.error_reporter.report_error(
-                    PluginError(f"插件 {plugin.name} 后处理失败: {e}")
+                    PluginError("插件 %s %s失败: %s", name, stage, e)
                 )
 
         return code
 
     def reload_plugins(self):
-        """重新加载所有插件"""
-        # 清空现有插件
-        for plugin in self.plugins.values():
-            if plugin.is_activated():
-                plugin.deactivate()
+        """重新加载插件：只注销不再存在的插件、注册新出现的插件，其余插件保持原状"""
+        if not self._loaded:
+            self._ensure_loaded()
+            return
+
+        self._enabled_names = frozenset(map(sys.intern, self.plugin_config.enabled_plugins))
+        desired = {sys.intern(plugin.name): (plugin, source)
+                   for plugin, source in self._discover_plugins()}
+
+        # 注销已不存在或来源发生变化的插件（包括手动注册的插件）
+        for name in list(self._plugins):
+            entry = desired.get(name)
+            if entry is None or entry[1] != self._plugin_sources.get(name):
+                self.unregister_plugin(name)
+
+        for name, (plugin, source) in desired.items():
+            if name not in self._plugins:
+                self.register_plugin(plugin, source)
+            elif name in self._enabled_names:
+                self.enable_plugin(name)
 
-        self.plugins.clear()
-        self.conversion_plugins.clear()
 
-        # 重新加载
-        self._load_plugins()
+def _build_steps(plugins, stage: str):
+    """按信任级别构建某一阶段的流水线，跳过noop方法"""
+    trusted = []
+    untrusted = []
+    for plugin in plugins:
+        step = getattr(plugin, stage)
+        if getattr(step, '_is_noop', False):
+            continue
+        (trusted if plugin.trusted else untrusted).append((plugin.name, step))
+    return tuple(trusted), tuple(untrusted)
 
 
 # 全局插件管理器
@@ -277,6 +392,6 @@ def register_plugin(plugin: Plugin):
     get_plugin_manager().register_plugin(plugin)
 
 
-def get_conversion_plugins() -> List[ConversionPlugin]:
+def get_conversion_plugins() -> Tuple[ConversionPlugin, ...]:
     """获取所有启用的转换插件"""
     return get_plugin_manager().get_conversion_plugins()
\ No newline at end of file
@@ -4,13 +4,21 @@ Pythva内置插件
 提供常用的内置插件实现
 """
 
-from typing import List, Dict, Any
-from .base import ConversionPlugin
+from typing import Dict, Any, Tuple
+from .base import ConversionPlugin, noop
+
+# 内置插件的预处理/后处理目前原样返回代码，没有需要编译的扫描循环。
+# 实现逐字符扫描时，将内层循环提取为模块级函数并使用 .._jit.optional_njit 装饰，
+# 未安装Numba时自动退回纯Python实现。
+# 基于正则的扫描应在类体中用re.compile预编译为类常量（如 _COMMENT_RE），不要在每次调用时编译。
+# 不使用numba.pycc做AOT编译：pycc已被Numba弃用，且cache=True可在首次编译后跨进程复用结果。
 
 
 class CommentPreserverPlugin(ConversionPlugin):
     """注释保留插件"""
 
+    trusted = True
+
     def __init__(self):
         super().__init__(
             name="comment_preserver",
@@ -24,10 +32,12 @@ class CommentPreserverPlugin(ConversionPlugin):
     def deactivate(self) -> bool:
         return True
 
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理：提取注释"""
         return code
 
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理：恢复注释"""
         # 这里可以实现注释恢复逻辑
@@ -37,6 +47,8 @@ class CommentPreserverPlugin(ConversionPlugin):
 class TypeAnnotationPlugin(ConversionPlugin):
     """类型注解增强插件"""
 
+    trusted = True
+
     def __init__(self):
         super().__init__(
             name="type_annotation",
@@ -50,10 +62,12 @@ class TypeAnnotationPlugin(ConversionPlugin):
     def deactivate(self) -> bool:
         return True
 
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理：分析类型注解"""
         return code
 
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理：添加类型注解"""
         # 这里可以实现类型注解增强逻辑
@@ -63,6 +77,8 @@ class TypeAnnotationPlugin(ConversionPlugin):
 class StringFormatterPlugin(ConversionPlugin):
     """字符串格式化插件"""
 
+    trusted = True
+
     def __init__(self):
         super().__init__(
             name="string_formatter",
@@ -76,10 +92,12 @@ class StringFormatterPlugin(ConversionPlugin):
     def deactivate(self) -> bool:
         return True
 
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理：分析字符串格式化"""
         return code
 
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理：优化字符串格式化"""
         # 这里可以实现字符串格式化优化逻辑
@@ -89,6 +107,8 @@ class StringFormatterPlugin(ConversionPlugin):
 class CodeStylePlugin(ConversionPlugin):
     """代码风格插件"""
 
+    trusted = True
+
     def __init__(self):
         super().__init__(
             name="code_style",
@@ -102,10 +122,12 @@ class CodeStylePlugin(ConversionPlugin):
     def deactivate(self) -> bool:
         return True
 
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理：分析代码风格"""
         return code
 
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理：统一代码风格"""
         # 这里可以实现代码风格统一逻辑
@@ -115,6 +137,8 @@ class CodeStylePlugin(ConversionPlugin):
 class ImportOptimizerPlugin(ConversionPlugin):
     """导入优化插件"""
 
+    trusted = True
+
     def __init__(self):
         super().__init__(
             name="import_optimizer",
@@ -128,25 +152,31 @@ class ImportOptimizerPlugin(ConversionPlugin):
     def deactivate(self) -> bool:
         return True
 
+    @noop
     def preprocess(self, code: str) -> str:
         """预处理：分析导入"""
         return code
 
+    @noop
     def postprocess(self, code: str) -> str:
         """后处理：优化导入"""
         # 这里可以实现导入优化逻辑
         return code
 
 
-def get_builtin_plugins() -> List[ConversionPlugin]:
-    """获取所有内置插件"""
-    return [
-        CommentPreserverPlugin(),
-        TypeAnnotationPlugin(),
-        StringFormatterPlugin(),
-        CodeStylePlugin(),
-        ImportOptimizerPlugin()
-    ]
+# 内置插件类（插件有状态，每个管理器各自创建实例，启停互不影响）
+_BUILTIN_PLUGIN_CLASSES = (
+    CommentPreserverPlugin,
+    TypeAnnotationPlugin,
+    StringFormatterPlugin,
+    CodeStylePlugin,
+    ImportOptimizerPlugin,
+)
+
+
+def get_builtin_plugins() -> Tuple[ConversionPlugin, ...]:
+    """获取所有内置插件（每次返回新的实例）"""
+    return tuple(plugin_class() for plugin_class in _BUILTIN_PLUGIN_CLASSES)
 
 
 # 插件注册
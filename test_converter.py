@@ -4,9 +4,19 @@ Pythva转换器测试
 """
 
 import unittest
-from core import convert_python_to_java_style
+from core import (
+    convert_python_to_java_style, clear_conversion_cache, _get_conversion_cache,
+    make_converter,
+)
+from config import ConversionConfig
 from mapper import convert_with_mapping
 
+try:
+    from pythva import web_demo
+except ImportError:
+    # Web演示需要Flask，并且只能以包的形式导入
+    web_demo = None
+
 
 class TestPythvaConverter(unittest.TestCase):
     """测试转换器功能"""
@@ -112,6 +122,71 @@ def test_literals():
         self.assertIn("Arrays.asList", result)
         self.assertIn("Map.of", result)
 
+    def test_docstrings_skipped(self):
+        """测试文档字符串不会被转换为输出语句"""
+        python_code = '''
+"""模块文档"""
+
+def greet():
+    """函数文档"""
+    "hello"
+'''
+        result = convert_python_to_java_style(python_code)
+        self.assertNotIn("模块文档", result)
+        self.assertNotIn("函数文档", result)
+        self.assertIn('System.out.println("hello");', result)
+
+    def test_unconverted_operand_grouping(self):
+        """测试原样输出的运算数保留括号"""
+        result = convert_python_to_java_style("z = a + (b if c else d)\n")
+        self.assertIn("(a + (b if c else d))", result)
+
+        result = convert_python_to_java_style("z = (lambda x: x) + 1\n")
+        self.assertIn("((lambda x: x) + 1)", result)
+
+    def test_conversion_cache(self):
+        """测试转换结果缓存"""
+        python_code = '''
+def calculate(a, b):
+    return a + b
+'''
+        clear_conversion_cache()
+        first = convert_python_to_java_style(python_code)
+        second = convert_python_to_java_style(python_code)
+        self.assertEqual(first, second)
+        self.assertEqual(_get_conversion_cache().cache_info().hits, 1)
+
+    def test_specialized_converter(self):
+        """测试按配置特化的转换器"""
+        python_code = '''
+def calculate(a, b):
+    total = [a, b]
+    return total
+'''
+        config = ConversionConfig(use_tabs=True, default_type="Any")
+        converter_class = make_converter(config)
+        self.assertIs(converter_class, make_converter(ConversionConfig(use_tabs=True, default_type="Any")))
+
+        result = converter_class().convert(python_code)
+        self.assertIn("public Any calculate(int a, int b)", result)
+        self.assertIn("\tList<Any> total", result)
+
+
+@unittest.skipIf(web_demo is None, "需要Flask及可导入的pythva包")
+class TestWebDemoCaching(unittest.TestCase):
+    """测试Web演示的HTTP缓存"""
+
+    def test_examples_etag_revalidation(self):
+        """测试携带返回的ETag再次请求时得到304（含压缩响应）"""
+        client = web_demo.app.test_client()
+        for headers in ({}, {'Accept-Encoding': 'gzip'}):
+            first = client.get('/examples', headers=headers)
+            self.assertEqual(first.status_code, 200)
+            etag = first.headers['ETag']
+
+            second = client.get('/examples', headers={**headers, 'If-None-Match': etag})
+            self.assertEqual(second.status_code, 304)
+
 
 def run_tests():
     """运行测试"""
@@ -4,77 +4,175 @@ Pythva Web演示界面
 提供基于Flask的Web界面来演示转换功能
 """
 
+import hashlib
+import json
 import os
 import sys
-from flask import Flask, render_template, request, jsonify
-from pathlib import Path
-
-# 添加当前目录到Python路径
-current_dir = Path(__file__).parent
-sys.path.insert(0, str(current_dir))
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Tuple
+from flask import Flask, render_template, request
+from werkzeug.exceptions import RequestEntityTooLarge
 
 from .core import convert_python_to_java_style
 from .mapper import convert_with_mapping
 from .config import get_conversion_config
-from .errors import get_error_reporter, reset_error_reporter
+from .errors import collect_errors
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from flask_compress import Compress
+except ImportError:
+    Compress = None
 
 
 # 创建Flask应用
-app = Flask(__name__)
+# 模板随包分发于 templates/ 目录
+app = Flask(__name__, template_folder='templates')
 app.secret_key = 'pythva-demo-secret-key'
 
+# 请求体大小上限（字节），过大的代码在解析前即被拒绝
+MAX_CODE_BYTES = 512 * 1024
+app.config['MAX_CONTENT_LENGTH'] = MAX_CODE_BYTES
 
-@app.route('/')
-def index():
-    """主页"""
-    return render_template('index.html')
+# 可选的响应压缩（安装flask-compress时启用），过小的响应不压缩
+if Compress is not None:
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_MIN_SIZE'] = 1024
+    # 流式响应保持逐块发送，不为压缩而整体缓冲
+    app.config['COMPRESS_STREAMS'] = False
+    # 压缩后的响应ETag会被改写（追加压缩算法），由flask-compress按改写后的ETag再做一次条件请求判断
+    app.config['COMPRESS_EVALUATE_CONDITIONAL_REQUEST'] = True
+    Compress(app)
 
 
-@app.route('/convert', methods=['POST'])
-def convert():
-    """转换代码"""
-    try:
-        data = request.get_json()
-        python_code = data.get('code', '')
-        use_enhanced = data.get('enhanced', False)
+def _dump_json_bytes(payload) -> bytes:
+    """序列化为JSON字节（优先使用orjson）"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False).encode('utf-8')
 
-        if not python_code.strip():
-            return jsonify({
-                'success': False,
-                'error': '请输入Python代码'
-            })
 
-        # 重置错误报告器
-        reset_error_reporter()
+def _json_response(payload, status: int = 200):
+    """构造JSON响应"""
+    return app.response_class(_dump_json_bytes(payload), status=status,
+                              mimetype='application/json')
+
+
+# 转换结果达到此长度（字符数）时分块输出响应
+STREAM_MIN_LENGTH = 16 * 1024
+# 分块输出时每片转换结果的长度（字符数）
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+def _etag_for(body: bytes) -> str:
+    """根据响应体计算强ETag"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _cacheable_response(body, etag: str, mimetype: str, max_age: int = 0):
+    """带ETag和Cache-Control的响应，If-None-Match命中时返回304"""
+    response = app.response_class(body, mimetype=mimetype)
+    response.set_etag(etag)
+    response.cache_control.public = True
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        # 内容可能变化：允许缓存，但每次使用前需向服务器确认
+        response.cache_control.no_cache = True
+    # 这里只匹配未压缩响应的ETag，压缩响应的ETag由flask-compress改写后再判断
+    return response.make_conditional(request)
+
+
+def _stream_convert_response(converted_code: str, error_count: int, warning_count: int):
+    """分块输出转换结果的JSON响应，转换结果按片转义，不生成完整的JSON副本"""
+    def generate():
+        yield b'{"success":true,"converted_code":"'
+        for start in range(0, len(converted_code), STREAM_CHUNK_SIZE):
+            # 去掉单个JSON字符串两端的引号，拼接后即为完整字符串的转义结果
+            yield _dump_json_bytes(converted_code[start:start + STREAM_CHUNK_SIZE])[1:-1]
+        yield b'","errors":%d,"warnings":%d}' % (error_count, warning_count)
+
+    return app.response_class(generate(), mimetype='application/json')
+
+
+# 转换结果缓存的输入长度上限（字符数），超出时不缓存
+CACHE_MAX_CODE_LENGTH = 64 * 1024
+
 
-        # 执行转换
+def _convert_uncached(python_code: str, use_enhanced: bool) -> Tuple[str, int, int]:
+    """执行转换，返回 (转换结果, 错误数, 警告数)"""
+    # 本次转换使用独立的错误报告器，不影响其他请求
+    with collect_errors() as error_reporter:
         if use_enhanced:
             converted_code = convert_with_mapping(python_code)
         else:
             converted_code = convert_python_to_java_style(python_code)
 
-        # 获取错误报告
-        error_reporter = get_error_reporter()
+    return converted_code, len(error_reporter.errors), len(error_reporter.warnings)
 
-        return jsonify({
-            'success': True,
-            'converted_code': converted_code,
-            'errors': len(error_reporter.errors),
-            'warnings': len(error_reporter.warnings)
-        })
 
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': f'转换失败: {str(e)}'
-        })
+# 按 (代码, 模式) 缓存转换结果及错误/警告计数，命中时无需重置错误报告器
+_convert_cached = lru_cache(maxsize=512)(_convert_uncached)
 
+# _convert_cached 中的结果所基于的配置对象
+_cached_config = None
 
-@app.route('/examples')
-def get_examples():
-    """获取示例代码"""
-    examples = {
-        'basic_class': '''class Calculator:
+
+def _convert_with_cache(python_code: str, use_enhanced: bool) -> Tuple[str, int, int]:
+    """使用结果缓存执行转换；配置更新或重新加载后（配置对象被替换）先清空缓存"""
+    global _cached_config
+    config = get_conversion_config()
+    if config is not _cached_config:
+        _convert_cached.cache_clear()
+        _cached_config = config
+    return _convert_cached(python_code, use_enhanced)
+
+
+# 转换进程池的规模上限，以及每个子进程处理多少次转换后回收（Python 3.11+）
+POOL_MAX_WORKERS = 4
+POOL_MAX_TASKS_PER_CHILD = 100
+
+# 是否把大输入交给转换进程池：只在多线程开发服务器下启用，
+# gunicorn的sync worker本身就是多进程，再开进程池只会增加开销
+_use_convert_pool = False
+
+# 转换进程池，启用后首次使用时创建
+_convert_pool = None
+
+
+def _get_convert_pool() -> ProcessPoolExecutor:
+    """获取转换进程池"""
+    global _convert_pool
+    if _convert_pool is None:
+        options = {'max_workers': min(os.cpu_count() or 1, POOL_MAX_WORKERS)}
+        if sys.version_info >= (3, 11):
+            options['max_tasks_per_child'] = POOL_MAX_TASKS_PER_CHILD
+        _convert_pool = ProcessPoolExecutor(**options)
+    return _convert_pool
+
+
+def _convert_large(python_code: str, use_enhanced: bool) -> Tuple[str, int, int]:
+    """转换大输入：启用进程池时在子进程中执行，避免长时间占用GIL；进程池失效时退回本进程执行"""
+    global _convert_pool
+    if not _use_convert_pool:
+        return _convert_uncached(python_code, use_enhanced)
+    try:
+        return _get_convert_pool().submit(_convert_uncached, python_code, use_enhanced).result()
+    except BrokenProcessPool:
+        _convert_pool = None
+        return _convert_uncached(python_code, use_enhanced)
+
+
+# 示例代码
+_EXAMPLES = {
+    'basic_class': '''class Calculator:
     def __init__(self, initial_value=0):
         self.result = initial_value
 
@@ -84,7 +182,7 @@ def get_examples():
     def calculate(self):
         return self.result * 2''',
 
-        'data_processor': '''from typing import List
+    'data_processor': '''from typing import List
 
 class DataProcessor:
     def __init__(self, name: str):
@@ -97,7 +195,7 @@ class DataProcessor:
     def add_item(self, item: int):
         self.data.append(item)''',
 
-        'advanced': '''class AdvancedCalculator:
+    'advanced': '''class AdvancedCalculator:
     def __init__(self):
         self.history = []
 
@@ -110,454 +208,189 @@ class DataProcessor:
         if b == 0:
             raise ValueError("除数不能为零")
         return a / b'''
-    }
+}
+
+# 示例代码的JSON响应体，导入时只序列化一次
+# 以 [名称, 代码] 数组的形式发送，前端可直接按顺序遍历
+_EXAMPLES_JSON = _dump_json_bytes(list(_EXAMPLES.items()))
+# 序列化后冻结，避免运行期修改导致与已缓存的响应体不一致
+_EXAMPLES = MappingProxyType(_EXAMPLES)
+
+# 示例代码在进程生命周期内不变，浏览器可直接缓存的时长（秒）
+EXAMPLES_MAX_AGE = 3600
 
-    return jsonify(examples)
+# 示例代码的ETag，浏览器可据此以304复用缓存
+_EXAMPLES_ETAG = _etag_for(_EXAMPLES_JSON)
+
+# /config响应缓存：(配置对象, JSON响应体, ETag)
+_config_json = (None, b'', '')
+
+# 渲染后的主页缓存：(HTML, ETag)，调试模式下每次重新渲染以便修改模板即时生效
+_index_page = None
+
+
+@app.route('/')
+def index():
+    """主页"""
+    global _index_page
+    if _index_page is None or app.debug:
+        html = render_template('index.html')
+        _index_page = (html, _etag_for(html.encode('utf-8')))
+    return _cacheable_response(_index_page[0], _index_page[1], 'text/html')
+
+
+def _load_json_body():
+    """解析请求体JSON（不在请求对象上缓存原始数据），格式错误时返回None"""
+    body = request.get_data(cache=False)
+    if not body:
+        return {}
+    try:
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _code_too_large_response():
+    """代码过长时的413响应"""
+    return _json_response({
+        'success': False,
+        'error': f'代码过长（上限 {MAX_CODE_BYTES // 1024}KB）'
+    }, status=413)
+
+
+@app.route('/convert', methods=['POST'])
+def convert():
+    """转换代码"""
+    if request.content_length is not None and request.content_length > MAX_CODE_BYTES:
+        return _code_too_large_response()
+
+    try:
+        data = _load_json_body()
+        if data is None:
+            return _json_response({
+                'success': False,
+                'error': '请求数据不是有效的JSON'
+            }, status=400)
+
+        python_code = data.get('code') or ''
+        use_enhanced = data.get('enhanced', False)
+
+        # isspace()直接扫描原字符串，不像strip()那样复制一份
+        if not python_code or python_code.isspace():
+            return _json_response({
+                'success': False,
+                'error': '请输入Python代码'
+            })
+
+        # 执行转换（较短的输入使用缓存，较长的输入交给进程池）
+        if len(python_code) < CACHE_MAX_CODE_LENGTH:
+            run_conversion = _convert_with_cache
+        else:
+            run_conversion = _convert_large
+        converted_code, error_count, warning_count = run_conversion(python_code, bool(use_enhanced))
+
+        if len(converted_code) >= STREAM_MIN_LENGTH:
+            return _stream_convert_response(converted_code, error_count, warning_count)
+
+        return _json_response({
+            'success': True,
+            'converted_code': converted_code,
+            'errors': error_count,
+            'warnings': warning_count
+        })
+
+    except RequestEntityTooLarge:
+        return _code_too_large_response()
+    except Exception as e:
+        return _json_response({
+            'success': False,
+            'error': f'转换失败: {str(e)}'
+        })
+
+
+@app.route('/examples')
+def get_examples():
+    """获取示例代码"""
+    return _cacheable_response(_EXAMPLES_JSON, _EXAMPLES_ETAG, 'application/json',
+                               max_age=EXAMPLES_MAX_AGE)
 
 
 @app.route('/config')
 def get_config():
     """获取当前配置"""
+    global _config_json
     config = get_conversion_config()
-    return jsonify({
-        'output_style': config.output_style,
-        'add_package_declaration': config.add_package_declaration,
-        'package_name': config.package_name,
-        'default_type': config.default_type,
-        'indent_size': config.indent_size,
-        'debug_mode': config.debug_mode
-    })
-
-
-def create_templates():
-    """创建HTML模板"""
-    templates_dir = Path('templates')
-    templates_dir.mkdir(exist_ok=True)
-
-    index_html = '''<!DOCTYPE html>
-<html lang="zh-CN">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Pythva - Python到Java风格转换器演示</title>
-    <style>
-        * {
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }
-
-        body {
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            min-height: 100vh;
-        }
-
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            padding: 20px;
-        }
-
-        .header {
-            text-align: center;
-            color: white;
-            margin-bottom: 30px;
-        }
-
-        .header h1 {
-            font-size: 3em;
-            margin-bottom: 10px;
-            text-shadow: 2px 2px 4px rgba(0,0,0,0.3);
-        }
-
-        .header p {
-            font-size: 1.2em;
-            opacity: 0.9;
-        }
-
-        .converter {
-            background: white;
-            border-radius: 15px;
-            box-shadow: 0 10px 30px rgba(0,0,0,0.2);
-            overflow: hidden;
-        }
-
-        .converter-tabs {
-            display: flex;
-            background: #f8f9fa;
-            border-bottom: 1px solid #dee2e6;
-        }
-
-        .tab {
-            flex: 1;
-            padding: 15px;
-            text-align: center;
-            cursor: pointer;
-            transition: all 0.3s ease;
-            border-bottom: 3px solid transparent;
-        }
-
-        .tab:hover {
-            background: #e9ecef;
-        }
-
-        .tab.active {
-            background: white;
-            border-bottom-color: #007bff;
-            color: #007bff;
-        }
-
-        .editor-container {
-            display: flex;
-            height: 500px;
-        }
-
-        .editor-panel {
-            flex: 1;
-            display: flex;
-            flex-direction: column;
-        }
-
-        .editor-header {
-            padding: 10px 15px;
-            background: #f8f9fa;
-            border-bottom: 1px solid #dee2e6;
-            font-weight: bold;
-        }
-
-        .editor {
-            flex: 1;
-            padding: 15px;
-            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-            font-size: 14px;
-            line-height: 1.5;
-            outline: none;
-            resize: none;
-            border: none;
-            background: #2d3748;
-            color: #e2e8f0;
-        }
-
-        .python-editor {
-            border-right: 1px solid #4a5568;
-        }
-
-        .toolbar {
-            padding: 15px;
-            background: #f8f9fa;
-            border-top: 1px solid #dee2e6;
-            display: flex;
-            gap: 10px;
-            align-items: center;
-        }
-
-        .btn {
-            padding: 8px 16px;
-            border: none;
-            border-radius: 5px;
-            cursor: pointer;
-            font-size: 14px;
-            transition: all 0.3s ease;
-        }
-
-        .btn-primary {
-            background: #007bff;
-            color: white;
-        }
-
-        .btn-primary:hover {
-            background: #0056b3;
-        }
-
-        .btn-secondary {
-            background: #6c757d;
-            color: white;
-        }
-
-        .btn-secondary:hover {
-            background: #545b62;
-        }
-
-        .checkbox {
-            margin-left: 10px;
-        }
-
-        .status {
-            margin-left: auto;
-            padding: 5px 10px;
-            border-radius: 3px;
-            font-size: 12px;
-        }
-
-        .status.success {
-            background: #d4edda;
-            color: #155724;
-        }
-
-        .status.error {
-            background: #f8d7da;
-            color: #721c24;
-        }
-
-        .loading {
-            display: none;
-            margin-left: 10px;
-        }
-
-        .examples {
-            max-height: 300px;
-            overflow-y: auto;
-            margin-top: 20px;
-        }
-
-        .example-item {
-            background: white;
-            margin-bottom: 10px;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-
-        .example-header {
-            padding: 10px 15px;
-            background: #f8f9fa;
-            cursor: pointer;
-            font-weight: bold;
-        }
-
-        .example-code {
-            padding: 15px;
-            background: #2d3748;
-            color: #e2e8f0;
-            font-family: 'Monaco', 'Menlo', 'Ubuntu Mono', monospace;
-            font-size: 13px;
-            display: none;
-        }
-
-        @media (max-width: 768px) {
-            .editor-container {
-                flex-direction: column;
-                height: auto;
-            }
-
-            .python-editor {
-                border-right: none;
-                border-bottom: 1px solid #4a5568;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🚀 Pythva</h1>
-            <p>Python到Java风格转换器 - 体验双语编程魅力</p>
-        </div>
-
-        <div class="converter">
-            <div class="converter-tabs">
-                <div class="tab active" onclick="switchTab('converter')">在线转换</div>
-                <div class="tab" onclick="switchTab('examples')">示例代码</div>
-            </div>
-
-            <div id="converter-tab" class="tab-content">
-                <div class="editor-container">
-                    <div class="editor-panel">
-                        <div class="editor-header">Python代码</div>
-                        <textarea class="editor python-editor" id="python-code" placeholder="请输入Python代码..."></textarea>
-                    </div>
-                    <div class="editor-panel">
-                        <div class="editor-header">Java风格代码</div>
-                        <textarea class="editor" id="java-code" placeholder="转换结果将在这里显示..." readonly></textarea>
-                    </div>
-                </div>
-
-                <div class="toolbar">
-                    <button class="btn btn-primary" onclick="convertCode()">转换代码</button>
-                    <button class="btn btn-secondary" onclick="clearAll()">清空</button>
-                    <label class="checkbox">
-                        <input type="checkbox" id="enhanced-mode"> 增强模式
-                    </label>
-                    <div class="status" id="status"></div>
-                    <div class="loading" id="loading">转换中...</div>
-                </div>
-            </div>
-
-            <div id="examples-tab" class="tab-content" style="display: none;">
-                <div class="examples" id="examples-container">
-                    <!-- 示例代码将在这里动态加载 -->
-                </div>
-            </div>
-        </div>
-    </div>
-
-    <script>
-        let currentTab = 'converter';
-
-        function switchTab(tabName) {
-            currentTab = tabName;
-
-            // 更新标签状态
-            document.querySelectorAll('.tab').forEach(tab => {
-                tab.classList.remove('active');
-            });
-            event.target.classList.add('active');
-
-            // 更新内容显示
-            document.getElementById('converter-tab').style.display =
-                tabName === 'converter' ? 'block' : 'none';
-            document.getElementById('examples-tab').style.display =
-                tabName === 'examples' ? 'block' : 'none';
-
-            if (tabName === 'examples') {
-                loadExamples();
-            }
-        }
-
-        async function convertCode() {
-            const pythonCode = document.getElementById('python-code').value;
-            const enhancedMode = document.getElementById('enhanced-mode').checked;
-
-            if (!pythonCode.trim()) {
-                showStatus('请输入Python代码', 'error');
-                return;
-            }
-
-            showStatus('转换中...', 'loading');
-
-            try {
-                const response = await fetch('/convert', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    },
-                    body: JSON.stringify({
-                        code: pythonCode,
-                        enhanced: enhancedMode
-                    })
-                });
-
-                const result = await response.json();
-
-                if (result.success) {
-                    document.getElementById('java-code').value = result.converted_code;
-                    showStatus(`转换完成 (${result.errors}错误, ${result.warnings}警告)`, 'success');
-                } else {
-                    showStatus(result.error, 'error');
-                }
-            } catch (error) {
-                showStatus('网络错误，请稍后重试', 'error');
-            }
-        }
-
-        function showStatus(message, type) {
-            const status = document.getElementById('status');
-            const loading = document.getElementById('loading');
-
-            status.textContent = message;
-            loading.style.display = type === 'loading' ? 'block' : 'none';
-
-            status.className = 'status ' + type;
-        }
-
-        function clearAll() {
-            document.getElementById('python-code').value = '';
-            document.getElementById('java-code').value = '';
-            showStatus('');
-        }
-
-        async function loadExamples() {
-            try {
-                const response = await fetch('/examples');
-                const examples = await response.json();
-
-                const container = document.getElementById('examples-container');
-
-                for (const [key, code] of Object.entries(examples)) {
-                    const exampleDiv = document.createElement('div');
-                    exampleDiv.className = 'example-item';
-
-                    exampleDiv.innerHTML = `
-                        <div class="example-header" onclick="toggleExample('${key}')">
-                            ${key.replace('_', ' ').toUpperCase()}
-                        </div>
-                        <div class="example-code" id="example-${key}">
-                            <pre>${escapeHtml(code)}</pre>
-                            <button onclick="useExample('${key}')">使用此示例</button>
-                        </div>
-                    `;
-
-                    container.appendChild(exampleDiv);
-                }
-            } catch (error) {
-                console.error('加载示例失败:', error);
-            }
-        }
-
-        function toggleExample(exampleId) {
-            const codeDiv = document.getElementById(`example-${exampleId}`);
-            codeDiv.style.display = codeDiv.style.display === 'none' ? 'block' : 'none';
-        }
-
-        function useExample(exampleId) {
-            // 这里需要从服务器获取示例代码
-            fetch('/examples')
-                .then(response => response.json())
-                .then(examples => {
-                    document.getElementById('python-code').value = examples[exampleId];
-                    switchTab('converter');
-                });
-        }
-
-        function escapeHtml(text) {
-            const div = document.createElement('div');
-            div.textContent = text;
-            return div.innerHTML;
-        }
-
-        // 快捷键支持
-        document.addEventListener('keydown', function(e) {
-            if (e.ctrlKey && e.key === 'Enter') {
-                convertCode();
-            }
-        });
-
-        // 初始化
-        document.addEventListener('DOMContentLoaded', function() {
-            // 添加一些示例代码
-            document.getElementById('python-code').value = `class HelloWorld:
-    def __init__(self, name):
-        self.name = name
+    # 配置对象不可变，更新配置会替换为新对象，据此判断缓存的JSON是否过期
+    if _config_json[0] is not config:
+        config_body = _dump_json_bytes({
+            'output_style': config.output_style,
+            'add_package_declaration': config.add_package_declaration,
+            'package_name': config.package_name,
+            'default_type': config.default_type,
+            'indent_size': config.indent_size,
+            'debug_mode': config.debug_mode
+        })
+        _config_json = (config, config_body, _etag_for(config_body))
+    return _cacheable_response(_config_json[1], _config_json[2], 'application/json')
+
+
+def _warmup():
+    """启动前执行一次转换，提前完成配置加载和转换器初始化"""
+    _convert_uncached("class A:\n    pass\n", False)
+    _convert_uncached("class A:\n    pass\n", True)
 
-    def greet(self):
-        return f"Hello, {self.name}!"
 
-# 使用示例
-obj = HelloWorld("World")
-print(obj.greet())`;
-        });
-    </script>
-</body>
-</html>'''
+def _run_gunicorn(host: str, port: int, workers: int) -> bool:
+    """使用gunicorn多进程运行应用，未安装gunicorn时返回False"""
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+
+    class _GunicornApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            # 转换是CPU密集型任务，使用sync进程而不是gevent等协程worker
+            self.cfg.set('worker_class', 'sync')
+            # 在主进程中加载应用，预热结果通过fork由各worker共享
+            self.cfg.set('preload_app', True)
+
+        def load(self):
+            return app
 
-    with open(templates_dir / 'index.html', 'w', encoding='utf-8') as f:
-        f.write(index_html)
+    _GunicornApplication().run()
+    return True
 
 
-def run_web_demo(host='127.0.0.1', port=5000, debug=False):
+def _run_dev_server(host: str, port: int, debug: bool):
+    """使用Flask多线程开发服务器运行应用，大输入的转换交给进程池"""
+    global _use_convert_pool
+    _use_convert_pool = True
+    app.run(host=host, port=port, debug=debug, threaded=True)
+
+
+def run_web_demo(host='127.0.0.1', port=5000, debug=False, workers=None):
     """运行Web演示"""
-    # 创建模板
-    create_templates()
+    workers = workers or os.cpu_count() or 1
 
     print(f"🚀 Pythva Web演示启动中...")
     print(f"📍 访问地址: http://{host}:{port}")
     print(f"🔧 调试模式: {'开启' if debug else '关闭'}")
+    if not debug:
+        print(f"👷 工作进程: {workers}")
     print("-" * 50)
 
-    app.run(host=host, port=port, debug=debug)
+    _warmup()
+    print("⚙️ 预热完成")
+
+    # 调试模式使用开发服务器（支持自动重载和调试器）
+    if debug:
+        _run_dev_server(host, port, debug=True)
+    elif not _run_gunicorn(host, port, workers):
+        print("⚠️ 未安装gunicorn，使用多线程开发服务器")
+        _run_dev_server(host, port, debug=False)
 
 
 if __name__ == "__main__":
@@ -567,7 +400,8 @@ if __name__ == "__main__":
     parser.add_argument('--host', default='127.0.0.1', help='监听主机')
     parser.add_argument('--port', type=int, default=5000, help='监听端口')
     parser.add_argument('--debug', action='store_true', help='开启调试模式')
+    parser.add_argument('--workers', type=int, default=None, help='工作进程数（默认为CPU核心数）')
 
     args = parser.parse_args()
 
-    run_web_demo(host=args.host, port=args.port, debug=args.debug)
\ No newline at end of file
+    run_web_demo(host=args.host, port=args.port, debug=args.debug, workers=args.workers)
\ No newline at end of file